@@ -1,12 +1,22 @@
-from app.models.feed import Post
-from app.services.feed_service import feed_service_obj
+from app.models.feed import Post, FeedPage
+from app.services.feed_service import FeedService, get_feed_service
 from app.core.dependencies import get_current_user
-from fastapi import APIRouter, Depends
-from typing import List, Dict
+from app.core.pagination import InvalidCursor
+from app.config import settings
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Dict, Optional
 
 
 router = APIRouter(prefix="/feed", tags=["Feed"])
 
-@router.get("/view_feed", response_model=List[Post])
-async def view_feed(current_user: Dict = Depends(get_current_user)):
-    return feed_service_obj.generate_feed(user_id=current_user['user_id'])
+@router.get("/view_feed", response_model=FeedPage)
+async def view_feed(
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    page_size: int = Query(settings.feed_page_size, ge=1, le=settings.feed_max_page_size),
+    current_user: Dict = Depends(get_current_user),
+    feed_service_obj: FeedService = Depends(get_feed_service)
+):
+    try:
+        return await feed_service_obj.generate_feed(user_id=current_user['user_id'], cursor=cursor, page_size=page_size)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,5 +1,6 @@
 # app/config.py
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 import os
 
@@ -16,15 +17,46 @@ class Settings(BaseSettings):
 
     ## redis
     redis_url: str
+    redis_max_connections: int = 50
+    redis_socket_timeout_seconds: float = 2.0
+    redis_socket_connect_timeout_seconds: float = 2.0
+    redis_health_check_interval_seconds: int = 30
 
     ## mongo
     mongo_url: str
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 10
+    mongo_wait_queue_timeout_ms: int = 5000
 
     ## jwt
-    jwt_secret_key: str
-    jwt_algorithm: str = "HS256"
+    jwt_secret_key: Optional[str] = None # legacy HS256 secret, tokens are now verified against userService's JWKS
+    jwks_url: str = "http://localhost:4000/.well-known/jwks.json"
+    jwks_refresh_seconds: int = 300
+    jwks_min_refresh_seconds: int = 30
+    jwks_timeout_seconds: float = 5.0
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
+    token_cache_max_entries: int = 10000
+
+    ## feed
+    feed_page_size: int = 10
+    feed_max_page_size: int = 50
+
+    ## pull-on-read authors
+    pull_authors_refresh_seconds: int = 60
+    pull_following_cache_ttl_seconds: int = 300
+
+    ## post hydration cache
+    post_cache_max_entries: int = 10000
+    post_cache_ttl_seconds: int = 3600
+    post_cache_local_ttl_seconds: int = 60
+
+    ## precompute job
+    precompute_shards: int = 16
+    precompute_concurrency: int = 4
+    precompute_batch_size: int = 100
+    precompute_page_size: int = 1000
+    precompute_watermark_grace_seconds: int = 300 # longer than the slowest post upload
     
     class Config:
         env_file = ".env"
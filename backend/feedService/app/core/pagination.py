@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+import base64
+import json
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by encode_cursor"""
+
+def encode_cursor(created_at: datetime, post_id: str) -> str:
+    """Encode the (created_at, post_id) of the last item in a page into an opaque cursor"""
+    raw = json.dumps({"c": created_at.isoformat(), "p": str(post_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8').rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, ObjectId]]:
+    """Decode an opaque cursor back into (created_at, post_id). Raises InvalidCursor on a malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode('utf-8')))
+        return datetime.fromisoformat(raw["c"]), ObjectId(raw["p"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor(f"Invalid cursor: {str(e)}")
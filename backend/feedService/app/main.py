@@ -1,13 +1,52 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import logging
+
 from app.api import feeds
+from app.db.mongo import MongoDBConnection
+from app.db.cache import RedisConnection
+from app.services.post_cache import post_cache_obj
 from app.config import settings
+from app.core.token_cache import verified_token_cache
+from app.core.jwks import jwks_cache
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    logger.info("Application starting...")
+    try:
+        await MongoDBConnection.initialize()
+        await RedisConnection.initialize()
+        post_cache_obj.start_invalidation_listener()
+        await jwks_cache.start()
+        logger.info("All connections initialized")
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}", exc_info=True)
+        raise
+
+    yield
+
+    # Shutdown
+    logger.info("Application shutting down...")
+    try:
+        await jwks_cache.stop()
+        await post_cache_obj.stop_invalidation_listener()
+        MongoDBConnection.close()
+        await RedisConnection.close()
+        logger.info("All connections closed")
+    except Exception as e:
+        logger.error(f"Shutdown error: {str(e)}", exc_info=True)
 
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
-    description="Feed Generation service"
+    description="Feed Generation service",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -27,8 +66,13 @@ def root():
     return {"service": "Posts Service", "version": "1.0.0"}
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    """Health check endpoint"""
+    if not await MongoDBConnection.health_check():
+        return {"status": "unhealthy", "mongodb": "down"}, 503
+    if not await RedisConnection.health_check():
+        return {"status": "unhealthy", "redis": "down"}, 503
+    return {"status": "healthy", "mongodb": "up", "redis": "up", "token_cache": verified_token_cache.stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Dict
 from datetime import datetime
 
 class Post(BaseModel):
@@ -7,4 +7,9 @@ class Post(BaseModel):
     user_id: str
     post_url: str
     caption: Optional[str] = None
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    variants: Optional[Dict[str, Dict[str, str]]] = None  # {size: {format: url}}
+
+class FeedPage(BaseModel):
+    posts: List[Post]
+    next_cursor: Optional[str] = None
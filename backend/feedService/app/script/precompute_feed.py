@@ -1,23 +1,36 @@
 from app.db.database import get_db
-from app.db.mongo import get_mongo
+from app.db.mongo import get_sync_mongo
 from app.models.feed import Post
+from app.config import settings
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Iterable, Iterator, Tuple
 from pymongo import UpdateOne, DESCENDING
 from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+import argparse
 import logging
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 class PreComputeFeed():
     def __init__(self):
         self.db = get_db()
-        mongo = get_mongo()
+        mongo = get_sync_mongo()
         mongoDb = mongo['db1']
         self.postsCollection = mongoDb['posts']
         self.feedCollecttion = mongoDb['precomputefeed']
+        self.stateCollection = mongoDb['precompute_state']
+        self.pullAuthorsCollection = mongoDb['pull_authors']
         self._create_index()
 
     def _create_index(self):
@@ -25,38 +38,160 @@ class PreComputeFeed():
             [("user_id", 1), ("post_id", 1)],
             unique=True
         )
+        ## post_id is the tie-breaker of the feed cursor, so keyset pages are a single index seek
         self.feedCollecttion.create_index(
-            [("user_id", 1), ("created_at", DESCENDING)]
+            [("user_id", 1), ("created_at", DESCENDING), ("post_id", DESCENDING)]
         )
         self.postsCollection.create_index(
             [("user_id", 1), ("created_at", DESCENDING)]
         )
+        ## Incremental runs scan posts past the watermark in (created_at, _id) order
+        self.postsCollection.create_index(
+            [("created_at", 1), ("_id", 1)]
+        )
+
+    def _get_pull_authors(self) -> set:
+        """Authors served pull-on-read by the feed API, their posts are never fanned out"""
+        return {doc['_id'] for doc in self.pullAuthorsCollection.find({}, {"_id": 1})}
+
+    def _get_watermark(self) -> Optional[Dict]:
+        return self.stateCollection.find_one({"_id": "feed_watermark"})
+
+    def _set_watermark(self, created_at: datetime, post_id: ObjectId) -> None:
+        self.stateCollection.update_one(
+            {"_id": "feed_watermark"},
+            {"$set": {"created_at": created_at, "post_id": post_id, "updated_at": datetime.now()}},
+            upsert=True
+        )
+
+    def _get_latest_post(self, before: datetime) -> Optional[Dict]:
+        return self.postsCollection.find_one(
+            {"created_at": {"$lt": before}},
+            {"created_at": 1},
+            sort=[("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
     
-    def _get_users(self) -> List[str]:
+    def _get_checkpoint(self, run_id: str, shard: int) -> Optional[Dict]:
+        return self.stateCollection.find_one({"_id": f"shard:{run_id}:{shard}"})
+
+    def _save_checkpoint(self, run_id: str, shard: int, last_user_id: Optional[str], users: int, feed_rows: int, done: bool) -> None:
+        self.stateCollection.update_one(
+            {"_id": f"shard:{run_id}:{shard}"},
+            {"$set": {
+                "last_user_id": last_user_id,
+                "users": users,
+                "feed_rows": feed_rows,
+                "done": done,
+                "updated_at": datetime.now()
+            }},
+            upsert=True
+        )
+
+    @staticmethod
+    def _shard_bounds(shards: int) -> List[tuple]:
+        """Split the UUID space into contiguous [lower, upper) ranges, one per shard"""
+        step = (1 << 128) // shards
+        bounds = []
+        for shard in range(shards):
+            lower = str(uuid.UUID(int=shard * step)) if shard else None
+            upper = str(uuid.UUID(int=(shard + 1) * step)) if shard < shards - 1 else None
+            bounds.append((lower, upper))
+        return bounds
+
+    def _get_users_page(self, lower: Optional[str], upper: Optional[str], after: Optional[str], limit: int) -> List[str]:
+        """Next page of user ids in [lower, upper), ordered by id and strictly after the given id"""
         try:
-            result = self.db.table('users').select('id').execute()
+            query = self.db.table('users').select('id')
+            if after:
+                query = query.gt('id', after)
+            elif lower:
+                query = query.gte('id', lower)
+            if upper:
+                query = query.lt('id', upper)
+            result = query.order('id').limit(limit).execute()
             return [user['id'] for user in (result.data or [])]
         except Exception as e:
-            logger.error(f"Failed to fetch users: {str(e)}", exc_info=True)
+            logger.error(f"Failed to fetch users page: {str(e)}", exc_info=True)
             raise
-    
+
+    def _get_users(self, lower: Optional[str]=None, upper: Optional[str]=None, after: Optional[str]=None) -> Iterator[str]:
+        """Stream user ids in id order with keyset pagination, only one page is held in memory"""
+        while True:
+            page = self._get_users_page(lower, upper, after, settings.precompute_page_size)
+            if not page:
+                return
+            yield from page
+            after = page[-1]
+
+    def _stream_follows(self, key: str, apply_filter: Callable) -> Iterator[Dict]:
+        """
+        Stream follows rows matching apply_filter, keyset-paginated on (key, id) so no page repeats or
+        skips rows and PostgREST's row cap never truncates the result. Only one page is held in memory
+        """
+        after = None
+        while True:
+            query = apply_filter(self.db.table('follows').select('id, follower_id, following_id'))
+            if after:
+                query = query.or_(f"{key}.gt.{after[0]},and({key}.eq.{after[0]},id.gt.{after[1]})")
+            result = query.order(key).order('id').limit(settings.precompute_page_size).execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < settings.precompute_page_size:
+                return
+            after = (rows[-1][key], rows[-1]['id'])
+
+    def _get_following_edges(self, first_follower: str, last_follower: str) -> Iterator[Tuple[str, str]]:
+        """Stream (follower_id, following_id) edges for followers in [first_follower, last_follower]"""
+        try:
+            rows = self._stream_follows(
+                'follower_id',
+                lambda query: query.gte('follower_id', first_follower).lte('follower_id', last_follower)
+            )
+            for row in rows:
+                yield row['follower_id'], row['following_id']
+        except Exception as e:
+            logger.error(f"Failed to stream following relationships: {str(e)}", exc_info=True)
+            raise
+
+    def _get_follower_edges(self, creators: List[str]) -> Iterator[Tuple[str, str]]:
+        """Stream (following_id, follower_id) edges of every follower of the given creators"""
+        try:
+            rows = self._stream_follows('following_id', lambda query: query.in_('following_id', creators))
+            for row in rows:
+                yield row['following_id'], row['follower_id']
+        except Exception as e:
+            logger.error(f"Failed to stream follower relationships: {str(e)}", exc_info=True)
+            raise
+
     def _create_follower_following_map(self, users: List[str]) -> Dict[str, List[str]]:
+        """Group the edges of one id-ordered batch of users per follower. Memory is bounded by the batch"""
         try:
-            result = self.db.table('follows')\
-            .select('follower_id, following_id')\
-            .in_('follower_id', users)\
-            .execute()
+            batch = set(users)
             follower_following_map = {}
-            for row in (result.data or []):
-                follower_id = row['follower_id']
-                following_id = row['following_id']
-                if follower_id not in follower_following_map:
-                    follower_following_map[follower_id] = []
-                follower_following_map[follower_id].append(following_id)
+            for follower_id, following_id in self._get_following_edges(users[0], users[-1]):
+                if follower_id in batch:
+                    follower_following_map.setdefault(follower_id, []).append(following_id)
             return follower_following_map
         except Exception as e:
             logger.error(f"Failed to fetch following relationships: {str(e)}", exc_info=True)
             raise
+
+    def _get_new_posts(self, watermark: Dict, before: datetime, limit: int) -> List[Dict]:
+        """Posts past the watermark in (created_at, _id) order, only those created before the given cutoff"""
+        try:
+            query = {
+                "$or": [
+                    {"created_at": {"$gt": watermark['created_at'], "$lt": before}},
+                    {"created_at": watermark['created_at'], "_id": {"$gt": watermark['post_id']}}
+                ]
+            }
+            cursor = self.postsCollection.find(query, {"user_id": 1, "created_at": 1})\
+                .sort([("created_at", 1), ("_id", 1)])\
+                .limit(limit)
+            return list(cursor)
+        except Exception as e:
+            logger.error(f"Failed to fetch posts past watermark: {str(e)}", exc_info=True)
+            raise
     
     def _get_posts(self, creators: List[str], posts_per_creator: int=5) -> Dict[str, List[Dict]]:
         try:
@@ -97,10 +232,12 @@ class PreComputeFeed():
             logger.error(f"Failed to fetch posts for creators: {str(e)}", exc_info=True)
             raise
     
-    def _update_feed_table(self, feeds: List[Dict]) -> None:
+    def _update_feed_table(self, feeds: List[Dict]) -> int:
+        """Insert missing feed rows. Rows that already exist are left untouched, returns number of rows inserted"""
         try:
             if not feeds:
-                return
+                return 0
+            now = datetime.now()
             operations = [
                 UpdateOne(
                     {
@@ -108,9 +245,9 @@ class PreComputeFeed():
                 "post_id": item['post_id']
                 },
                 {
-                "$set": {
+                "$setOnInsert": {
                     "created_at": item['created_at'],
-                    "updated_at": datetime.now()
+                    "updated_at": now
                     }
                 },
                 upsert=True
@@ -118,44 +255,174 @@ class PreComputeFeed():
                 for item in feeds
             ]
             result = self.feedCollecttion.bulk_write(operations, ordered=False)
-            return
+            return result.upserted_count
         except Exception as e:
             logger.error(f"Failed to update feeds table: {str(e)}", exc_info=True)
             raise
 
+    def _compute_batch(self, users_batch: List[str]) -> int:
+        """Compute and write the feed of one batch of users, returns number of feed rows inserted"""
+        follower_following_map = self._create_follower_following_map(users=users_batch)
+        logger.info(f"Created follower-following map")
+        all_creators = set()
+        for following_list in follower_following_map.values():
+            all_creators.update(following_list)
+        all_creators -= self._get_pull_authors()
+        if not all_creators:
+            return 0
+        posts = self._get_posts(list(all_creators))
+        logger.info("Bulk fetched posts for all creators that are followed by users in the batch")
+        feed = []
+        for user_id in users_batch:
+            following_list = follower_following_map.get(user_id, [])
+            for creator_id in following_list:
+                posts_by_creator = posts.get(creator_id, [])
+                for post in posts_by_creator:
+                    feed.append({
+                        "user_id": user_id,
+                        "post_id": ObjectId(post['post_id']),
+                        "created_at": post['created_at']
+                    })
+        logger.info("Computed feed for batch of users and now pushing bulk write to DB")
+        inserted = self._update_feed_table(feed)
+        logger.info("Pushed feed of current batch to DB")
+        return inserted
+
     def computeFeed(self, batch_size: int=2) -> None:
         try:
             logger.info("Starting Feed table updation")
-            users = self._get_users()
-            logger.info(f"Processing {len(users)} users")
-            for i in range(0, len(users), batch_size):
-                users_batch = users[i : i + batch_size]
+            for users_batch in _batched(self._get_users(), batch_size):
                 logger.info(f"Processing {len(users_batch)} users")
-                follower_following_map = self._create_follower_following_map(users=users_batch)
-                logger.info(f"Created follower-following map")
-                all_creators = set()
-                for following_list in follower_following_map.values():
-                    all_creators.update(following_list)
-                if not all_creators:
-                    continue
-                posts = self._get_posts(list(all_creators))
-                logger.info("Bulk fetched posts for all creators that are followed by users in the batch")
-                feed = []
-                for user_id in users_batch:
-                    following_list = follower_following_map.get(user_id, [])
-                    for creator_id in following_list:
-                        posts_by_creator = posts.get(creator_id, [])
-                        for post in posts_by_creator:
-                            feed.append({
-                                "user_id": user_id,
-                                "post_id": ObjectId(post['post_id']),
-                                "created_at": post['created_at']
-                            })
-                logger.info("Computed feed for batch of users and now pushing bulk write to DB")
-                self._update_feed_table(feed)
-                logger.info("Pushed feed of current batch to DB")
+                self._compute_batch(users_batch)
         except Exception as e:
             logger.error(f"Couldnt compute feed: {str(e)}", exc_info=True)
             raise
 
-precomputefeed_obj = PreComputeFeed()
\ No newline at end of file
+    def _run_shard(self, run_id: str, shard: int, lower: Optional[str], upper: Optional[str], batch_size: int) -> Dict:
+        """Process one id range, checkpointing the last user id after every batch"""
+        checkpoint = self._get_checkpoint(run_id, shard) or {}
+        users, feed_rows = checkpoint.get('users', 0), checkpoint.get('feed_rows', 0)
+        if checkpoint.get('done'):
+            logger.info(f"Shard {shard} already completed in run {run_id}, skipping")
+            return {"shard": shard, "users": users, "feed_rows": feed_rows, "seconds": 0.0, "resumed": True}
+        after = checkpoint.get('last_user_id')
+        if after:
+            logger.info(f"Resuming shard {shard} after user {after}")
+        start = time.monotonic()
+        for users_batch in _batched(self._get_users(lower, upper, after), batch_size):
+            feed_rows += self._compute_batch(users_batch)
+            users += len(users_batch)
+            after = users_batch[-1]
+            self._save_checkpoint(run_id, shard, after, users, feed_rows, done=False)
+        self._save_checkpoint(run_id, shard, after, users, feed_rows, done=True)
+        return {"shard": shard, "users": users, "feed_rows": feed_rows, "seconds": time.monotonic() - start, "resumed": bool(checkpoint)}
+
+    def computeFeedSharded(self, shards: int=None, concurrency: int=None, batch_size: int=None, run_id: str=None) -> List[Dict]:
+        """
+        Full recompute with the user id space split into shards processed concurrently.
+        Work is I/O bound (Supabase HTTP, Mongo), so shards run on a bounded thread pool.
+        Every run gets a fresh run_id unless one is passed, re-running with a failed run's run_id
+        resumes every shard from its checkpoint.
+        """
+        shards = shards or settings.precompute_shards
+        concurrency = concurrency or settings.precompute_concurrency
+        batch_size = batch_size or settings.precompute_batch_size
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        logger.info(f"Starting sharded feed updation run {run_id}: {shards} shards, concurrency {concurrency}")
+        summaries = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(self._run_shard, run_id, shard, lower, upper, batch_size): shard
+                for shard, (lower, upper) in enumerate(self._shard_bounds(shards))
+            }
+            failed = []
+            for future in as_completed(futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as e:
+                    logger.error(f"Shard {futures[future]} failed: {str(e)}", exc_info=True)
+                    failed.append(futures[future])
+        for summary in sorted(summaries, key=lambda item: item['shard']):
+            rate = summary['users'] / summary['seconds'] if summary['seconds'] else 0.0
+            logger.info(
+                f"Shard {summary['shard']}: {summary['users']} users, {summary['feed_rows']} feed rows, "
+                f"{summary['seconds']:.1f}s, {rate:.1f} users/s{' (resumed)' if summary['resumed'] else ''}"
+            )
+        if failed:
+            raise RuntimeError(f"Shards {sorted(failed)} failed in run {run_id}, re-run with --run-id {run_id} to resume")
+        return summaries
+
+    def computeFeedIncremental(self, batch_size: int=500) -> None:
+        """
+        Fan out only the posts created after the stored (created_at, _id) watermark.
+        The watermark advances after every batch, so a crashed run resumes where it stopped.
+
+        created_at is assigned by postService before the image upload, so a post can be inserted long after
+        its timestamp. Only posts older than the grace window are consumed, the rest wait for the next run.
+        """
+        try:
+            ## Posts still inside the grace window may not all be inserted yet
+            before = datetime.now() - timedelta(seconds=settings.precompute_watermark_grace_seconds)
+            watermark = self._get_watermark()
+            if watermark is None:
+                ## First run: seed the feed table with a full recompute and start tailing from there
+                logger.info("No watermark found, running full recompute")
+                latest = self._get_latest_post(before)
+                self.computeFeedSharded()
+                if latest:
+                    self._set_watermark(latest['created_at'], latest['_id'])
+                return
+            logger.info(f"Starting incremental feed updation from {watermark['created_at']}")
+            total_posts, total_rows = 0, 0
+            while True:
+                new_posts = self._get_new_posts(watermark, before, limit=batch_size)
+                if not new_posts:
+                    break
+                creators = list({post['user_id'] for post in new_posts} - self._get_pull_authors())
+                posts_by_creator = {}
+                for post in new_posts:
+                    posts_by_creator.setdefault(post['user_id'], []).append(post)
+                ## Followers are streamed page by page and written in page-sized chunks, never held all at once
+                feed, fanned_out = [], 0
+                for creator_id, follower_id in (self._get_follower_edges(creators) if creators else []):
+                    for post in posts_by_creator[creator_id]:
+                        feed.append({
+                            "user_id": follower_id,
+                            "post_id": post['_id'],
+                            "created_at": post['created_at']
+                        })
+                    if len(feed) >= settings.precompute_page_size:
+                        total_rows += self._update_feed_table(feed)
+                        fanned_out += len(feed)
+                        feed = []
+                total_rows += self._update_feed_table(feed)
+                fanned_out += len(feed)
+                total_posts += len(new_posts)
+                last = new_posts[-1]
+                watermark = {"created_at": last['created_at'], "post_id": last['_id']}
+                self._set_watermark(watermark['created_at'], watermark['post_id'])
+                logger.info(f"Fanned out {len(new_posts)} new posts to {fanned_out} feed rows")
+            logger.info(f"Incremental run done: {total_posts} posts, {total_rows} feed rows inserted")
+        except Exception as e:
+            logger.error(f"Couldnt compute incremental feed: {str(e)}", exc_info=True)
+            raise
+
+if __name__ == "__main__":
+    ## Built here rather than at import, constructing it connects to Supabase and Mongo
+    precomputefeed_obj = PreComputeFeed()
+    parser = argparse.ArgumentParser(description="Precompute user feeds")
+    parser.add_argument("--full", action="store_true", help="Recompute every user's feed instead of only posts past the watermark")
+    parser.add_argument("--shards", type=int, default=None, help="Number of user id shards for a full recompute")
+    parser.add_argument("--concurrency", type=int, default=None, help="Maximum number of shards processed at once")
+    parser.add_argument("--batch-size", type=int, default=None, help="Users per batch within a shard")
+    parser.add_argument("--run-id", default=None, help="Resume the shard checkpoints of this run")
+    args = parser.parse_args()
+    if args.full:
+        precomputefeed_obj.computeFeedSharded(
+            shards=args.shards,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            run_id=args.run_id
+        )
+    else:
+        precomputefeed_obj.computeFeedIncremental()
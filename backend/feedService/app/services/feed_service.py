@@ -1,69 +1,152 @@
-from app.db.database import get_db
 from app.db.mongo import get_mongo
-from app.models.feed import Post
+from app.db.cache import get_redis
+from app.db.database import get_db
+from app.models.feed import Post, FeedPage
+from app.services.post_cache import post_cache_obj
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.config import settings
 
-from typing import List
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
+import asyncio
+import json
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+## Authors above postService's fan-out threshold, refreshed at most every pull_authors_refresh_seconds
+_pull_authors: Dict = {"ids": [], "loaded_at": 0.0}
+
 class FeedService():
     def __init__(self):
-        self.db = get_db()
         mongo = get_mongo()
         mongoDatabase = mongo['db1']
         self.postsCollection = mongoDatabase['posts']
         self.precomputeFeedCollection = mongoDatabase['precomputefeed']
-    
-    def generate_feed(self, user_id: str, timestamp: datetime = None) -> List[Post]:
+        self.pullAuthorsCollection = mongoDatabase['pull_authors']
+        self.redis = get_redis()
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    @staticmethod
+    def _keyset_filter(position: Optional[Tuple[datetime, object]], id_field: str) -> Dict:
+        if not position:
+            return {}
+        last_created_at, last_post_id = position
+        return {"$or": [
+            {"created_at": {"$lt": last_created_at}},
+            {"created_at": last_created_at, id_field: {"$lt": last_post_id}}
+        ]}
+
+    async def _get_pull_authors(self) -> List[str]:
+        if time.monotonic() - _pull_authors["loaded_at"] > settings.pull_authors_refresh_seconds:
+            docs = await self.pullAuthorsCollection.find({}, {"_id": 1}).to_list(length=None)
+            _pull_authors["ids"] = [doc['_id'] for doc in docs]
+            _pull_authors["loaded_at"] = time.monotonic()
+        return _pull_authors["ids"]
+
+    async def _get_followed_pull_authors(self, user_id: str) -> List[str]:
+        """
+        Pull-on-read authors the user follows, cached in Redis for a short TTL. The key carries the
+        generation of the user's following set, which followService bumps on every follow and unfollow,
+        so a changed following list is read from follows again instead of waiting out the TTL
+        """
+        pull_authors = await self._get_pull_authors()
+        if not pull_authors:
+            return []
+        generation = await self.redis.get(f"following:{{{user_id}}}:gen")
+        key = f"pull_following:{user_id}:{generation.decode() if generation else 0}"
+        cached = await self.redis.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        ## Supabase client is sync, keep the event loop free while it runs
+        result = await asyncio.to_thread(
+            lambda: get_db().table('follows')
+                .select('following_id')
+                .eq('follower_id', user_id)
+                .in_('following_id', pull_authors)
+                .execute()
+        )
+        followed = [row['following_id'] for row in (result.data or [])]
+        await self.redis.setex(key, settings.pull_following_cache_ttl_seconds, json.dumps(followed))
+        return followed
+
+    async def _get_pulled_posts(self, authors: List[str], position, page_size: int) -> List[Dict]:
+        if not authors:
+            return []
+        query = {"user_id": {"$in": authors}, **self._keyset_filter(position, "_id")}
+        return await self.postsCollection \
+            .find(query, {"user_id": 1, "post_url": 1, "caption": 1, "created_at": 1, "variants": 1}) \
+            .sort([("created_at", -1), ("_id", -1)]) \
+            .limit(page_size) \
+            .to_list(length=page_size)
+
+    async def _followed_pulled_posts(self, user_id: str, position, page_size: int) -> List[Dict]:
+        authors = await self._get_followed_pull_authors(user_id)
+        return await self._get_pulled_posts(authors, position, page_size)
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def generate_feed(self, user_id: str, cursor: Optional[str] = None, page_size: Optional[int] = None) -> FeedPage:
+        """
+        Keyset-paginated feed read. The cursor encodes (created_at, post_id) of the last row of the
+        previous page, so every page is a single seek on the (user_id, created_at, post_id) index.
+        Post bodies are hydrated through the post cache instead of a per-row $lookup, and posts of
+        followed pull-on-read authors are merged in from the posts collection.
+        """
         try:
-            timestamp = timestamp or datetime.now()
-            pipeline = [
-                {
-                    "$match": {
-                        "user_id": user_id,
-                        "created_at": {"$lt": timestamp}
-                    }
-                },
-                {"$sort": {"created_at": -1}},
-                {"$limit": 5},
-                {
-                    "$lookup": {
-                        "from": "posts",
-                        "localField": "post_id",
-                        "foreignField": "_id",
-                        "as": "post_data"
-                    }
-                },
-                {"$unwind": "$post_data"},
-                {
-                    "$project": {
-                        "_id": "$post_data._id",
-                        "user_id": "$post_data.user_id",
-                        "post_url": "$post_data.post_url",
-                        "caption": "$post_data.caption",
-                        "created_at": "$post_data.created_at"
-                    }
-                },
-            ]
-            cursor = self.precomputeFeedCollection.aggregate(pipeline)
+            page_size = min(page_size or settings.feed_page_size, settings.feed_max_page_size)
+            position = decode_cursor(cursor)
+            match = {"user_id": user_id, **self._keyset_filter(position, "post_id")}
+            rows, pulled = await asyncio.gather(
+                self.precomputeFeedCollection
+                    .find(match, {"_id": 0, "post_id": 1, "created_at": 1})
+                    .sort([("created_at", -1), ("post_id", -1)])
+                    .limit(page_size)
+                    .to_list(length=page_size),
+                self._followed_pulled_posts(user_id, position, page_size)
+            )
+            ## Both sources are ordered by (created_at, post_id) desc, merge them and keep one page
+            entries = {row['post_id']: row['created_at'] for row in rows}
+            pulled_by_id = {}
+            for doc in pulled:
+                entries.setdefault(doc['_id'], doc['created_at'])
+                pulled_by_id[str(doc['_id'])] = doc
+            page = sorted(entries.items(), key=lambda item: (item[1], item[0]), reverse=True)[:page_size]
+
+            hydrated = await post_cache_obj.get_many(
+                [str(post_id) for post_id, _ in page if str(post_id) not in pulled_by_id]
+            )
+            hydrated.update(pulled_by_id)
             logger.info(f"Created Feed for user: {user_id}")
+            ## Rows whose post was deleted are skipped, but still advance the cursor
             posts = [
                 Post(
-                    post_id=str(doc['_id']),
-                    user_id=doc['user_id'],
-                    post_url=doc['post_url'],
-                    caption=doc['caption'],
-                    created_at=doc['created_at']
+                    post_id=str(post['_id']),
+                    user_id=post['user_id'],
+                    post_url=post['post_url'],
+                    caption=post.get('caption'),
+                    created_at=post['created_at'],
+                    variants=post.get('variants')
                 )
-                for doc in cursor
+                for post in (hydrated.get(str(post_id)) for post_id, _ in page) if post
             ]
-            return posts
+            ## A short page means the feed is exhausted
+            next_cursor = None
+            if len(page) == page_size:
+                last_post_id, last_created_at = page[-1]
+                next_cursor = encode_cursor(last_created_at, str(last_post_id))
+            return FeedPage(posts=posts, next_cursor=next_cursor)
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Couldn't generate feed for user: {user_id} {str(e)}")
             raise
-        
 
-feed_service_obj = FeedService()
\ No newline at end of file
+
+# Factory pattern function
+def get_feed_service() -> FeedService:
+    """Create new instance per request"""
+    return FeedService()
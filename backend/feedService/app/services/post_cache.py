@@ -0,0 +1,208 @@
+from app.db.cache import get_redis
+from app.db.mongo import get_mongo
+from app.config import settings
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+POST_KEY_PREFIX = "post:"
+POST_INVALIDATION_CHANNEL = "posts:invalidate"
+INVALIDATION_RETRY_MAX_SECONDS = 30
+
+class PostHydrationCache():
+    """
+    Two-tier post hydration: a bounded in-process LRU in front of Redis hashes (post:{id}),
+    with all remaining misses fetched from Mongo in a single $in query.
+    Local entries are evicted on posts:invalidate and expire after post_cache_local_ttl_seconds
+    regardless, in case an invalidation is missed.
+    """
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.post_cache_max_entries
+        self._lru: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._subscriber: Optional[asyncio.Task] = None
+
+    ## Clients are created in the app lifespan, so resolve them lazily
+    @property
+    def redis(self):
+        return get_redis()
+
+    @property
+    def postsCollection(self):
+        return get_mongo()['db1']['posts']
+
+    ## LRU ------------------------------------------------------------------------------
+
+    def _lru_get(self, post_id: str):
+        entry = self._lru.get(post_id)
+        if entry is None:
+            return None
+        post, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._lru[post_id]
+            return None
+        self._lru.move_to_end(post_id)
+        return post
+
+    def _lru_put(self, post_id: str, post: Dict) -> None:
+        self._lru[post_id] = (post, time.monotonic() + settings.post_cache_local_ttl_seconds)
+        self._lru.move_to_end(post_id)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def evict(self, post_id: str) -> None:
+        self._lru.pop(post_id, None)
+
+    ## Redis ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _serialize(post: Dict) -> Dict[str, str]:
+        return {
+            "user_id": post['user_id'],
+            "post_url": post['post_url'],
+            "caption": post.get('caption') or "",
+            "created_at": post['created_at'].isoformat(),
+            "variants": json.dumps(post.get('variants') or {})
+        }
+
+    @staticmethod
+    def _deserialize(post_id: str, raw: Dict[bytes, bytes]) -> Dict:
+        post = {k.decode(): v.decode() for k, v in raw.items()} # Decode from bytes -> string
+        return {
+            "_id": post_id,
+            "user_id": post['user_id'],
+            "post_url": post['post_url'],
+            "caption": post['caption'] or None,
+            "created_at": datetime.fromisoformat(post['created_at']),
+            "variants": json.loads(post.get('variants') or "{}") or None
+        }
+
+    async def _redis_get_many(self, post_ids: List[str]) -> Dict[str, Dict]:
+        pipe = self.redis.pipeline(transaction=False)
+        for post_id in post_ids:
+            pipe.hgetall(f"{POST_KEY_PREFIX}{post_id}")
+        found = {}
+        for post_id, raw in zip(post_ids, await pipe.execute()):
+            if raw:
+                found[post_id] = self._deserialize(post_id, raw)
+        return found
+
+    async def _redis_put_many(self, posts: Dict[str, Dict]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for post_id, post in posts.items():
+            key = f"{POST_KEY_PREFIX}{post_id}"
+            pipe.hset(key, mapping=self._serialize(post))
+            pipe.expire(key, settings.post_cache_ttl_seconds)
+        await pipe.execute()
+
+    ## Mongo ----------------------------------------------------------------------------
+
+    async def _mongo_get_many(self, post_ids: List[str]) -> Dict[str, Dict]:
+        cursor = self.postsCollection.find(
+            {"_id": {"$in": [ObjectId(post_id) for post_id in post_ids]}},
+            {"user_id": 1, "post_url": 1, "caption": 1, "created_at": 1, "variants": 1}
+        )
+        found = {}
+        async for doc in cursor:
+            post_id = str(doc['_id'])
+            doc['_id'] = post_id
+            found[post_id] = doc
+        return found
+
+    ## MAIN FUNCTIONS -------------------------------------------------------------------
+
+    async def get_many(self, post_ids: List[str]) -> Dict[str, Dict]:
+        """Hydrate posts by id. Ids of posts that no longer exist are absent from the result"""
+        posts = {}
+        misses = []
+        for post_id in dict.fromkeys(post_ids):
+            post = self._lru_get(post_id)
+            if post is not None:
+                posts[post_id] = post
+            else:
+                misses.append(post_id)
+        if not misses:
+            return posts
+
+        try:
+            from_redis = await self._redis_get_many(misses)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for post hydration: {str(e)}")
+            from_redis = {}
+        for post_id, post in from_redis.items():
+            self._lru_put(post_id, post)
+        posts.update(from_redis)
+
+        misses = [post_id for post_id in misses if post_id not in from_redis]
+        if not misses:
+            return posts
+
+        from_mongo = await self._mongo_get_many(misses)
+        logger.info(f"Hydrated {len(from_mongo)} posts from MongoDB")
+        for post_id, post in from_mongo.items():
+            self._lru_put(post_id, post)
+        posts.update(from_mongo)
+        if from_mongo:
+            try:
+                await self._redis_put_many(from_mongo)
+            except Exception as e:
+                logger.warning(f"Failed to backfill post cache: {str(e)}")
+        return posts
+
+    async def _listen_for_invalidations(self) -> None:
+        """
+        Subscribe and evict until cancelled. A dropped connection is retried with backoff, and since
+        messages published while disconnected are lost, the local LRU is cleared on every resubscribe
+        """
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(POST_INVALIDATION_CHANNEL)
+                if reconnecting:
+                    self._lru.clear()
+                    logger.info("Resubscribed to invalidations, cleared local cache")
+                backoff = 1.0
+                while True:
+                    ## Poll with a timeout, a blocking listen() would trip the pool's socket_timeout when idle
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self.evict(message['data'].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation listener lost its connection, retrying in {backoff:.0f}s: {str(e)}")
+                reconnecting = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, INVALIDATION_RETRY_MAX_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start_invalidation_listener(self) -> None:
+        """Evict posts from this worker's LRU when postService publishes a delete"""
+        if self._subscriber is None:
+            self._subscriber = asyncio.create_task(self._listen_for_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+
+
+post_cache_obj = PostHydrationCache()
@@ -0,0 +1,51 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.feeds import router
+from app.core.dependencies import get_current_user
+from app.core.pagination import decode_cursor
+from app.models.feed import Post
+from app.services.feed_service import get_feed_service
+
+class FailingFeedService():
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def generate_feed(self, user_id, cursor=None, page_size=None):
+        raise self.error
+
+def _client(error: Exception) -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "user-1"}
+    app.dependency_overrides[get_feed_service] = lambda: FailingFeedService(error)
+    return TestClient(app, raise_server_exceptions=False)
+
+def _invalid_cursor_error() -> Exception:
+    try:
+        decode_cursor("not-a-cursor!")
+    except ValueError as e:
+        return e
+
+def _validation_error() -> Exception:
+    try:
+        Post(post_id="1", user_id="user-1")
+    except ValidationError as e:
+        return e
+
+def test_malformed_cursor_is_a_bad_request():
+    response = _client(_invalid_cursor_error()).get("/feed/view_feed", params={"cursor": "not-a-cursor!"})
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()['detail']
+
+def test_invalid_stored_post_is_a_server_error():
+    """A post that fails model validation is our bug, not a bad request"""
+    response = _client(_validation_error()).get("/feed/view_feed")
+    assert response.status_code == 500
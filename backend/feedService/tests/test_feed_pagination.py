@@ -0,0 +1,46 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime, timezone
+from bson import ObjectId
+import base64
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursor
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the (created_at, post_id) it was built from"""
+    created_at = datetime(2024, 5, 17, 13, 45, 12, 123456, tzinfo=timezone.utc)
+    post_id = ObjectId()
+    assert decode_cursor(encode_cursor(created_at, str(post_id))) == (created_at, post_id)
+
+def test_cursor_round_trip_naive_datetime():
+    created_at = datetime(2024, 1, 1, 0, 0, 0)
+    post_id = ObjectId()
+    assert decode_cursor(encode_cursor(created_at, str(post_id))) == (created_at, post_id)
+
+def test_cursor_is_unpadded_urlsafe():
+    cursor = encode_cursor(datetime.now(), str(ObjectId()))
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_missing_cursor_is_first_page(cursor):
+    assert decode_cursor(cursor) is None
+
+def _encode_raw(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8').rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    _encode_raw("not json"),
+    _encode_raw('{"c": "2024-01-01T00:00:00"}'),
+    _encode_raw('{"p": "65f0c0ffee0000000000beef"}'),
+    _encode_raw('{"c": "yesterday", "p": "65f0c0ffee0000000000beef"}'),
+    _encode_raw('{"c": "2024-01-01T00:00:00", "p": "not-an-object-id"}'),
+    _encode_raw('["2024-01-01T00:00:00", "65f0c0ffee0000000000beef"]'),
+])
+def test_malformed_cursor_raises_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor, match="Invalid cursor"):
+        decode_cursor(cursor)
@@ -0,0 +1,39 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uuid
+from app.script.precompute_feed import PreComputeFeed
+
+def test_single_shard_is_unbounded():
+    assert PreComputeFeed._shard_bounds(1) == [(None, None)]
+
+@pytest.mark.parametrize("shards", [2, 3, 7, 16, 64])
+def test_shards_cover_the_uuid_space_without_gaps(shards):
+    """First shard starts unbounded, last ends unbounded, each upper bound is the next lower bound"""
+    bounds = PreComputeFeed._shard_bounds(shards)
+    assert len(bounds) == shards
+    assert bounds[0][0] is None
+    assert bounds[-1][1] is None
+    for (_, upper), (lower, _) in zip(bounds, bounds[1:]):
+        assert upper == lower
+
+@pytest.mark.parametrize("shards", [2, 7, 16])
+def test_bounds_are_increasing_canonical_uuids(shards):
+    bounds = PreComputeFeed._shard_bounds(shards)
+    inner = [lower for lower, _ in bounds[1:]]
+    assert inner == sorted(inner)
+    assert len(set(inner)) == len(inner)
+    for bound in inner:
+        assert str(uuid.UUID(bound)) == bound
+
+def test_every_id_falls_in_exactly_one_shard():
+    bounds = PreComputeFeed._shard_bounds(8)
+    for user_id in [str(uuid.UUID(int=0)), str(uuid.UUID(int=(1 << 128) - 1))] + [str(uuid.uuid4()) for _ in range(200)]:
+        matches = [
+            shard for shard, (lower, upper) in enumerate(bounds)
+            if (lower is None or user_id >= lower) and (upper is None or user_id < upper)
+        ]
+        assert len(matches) == 1
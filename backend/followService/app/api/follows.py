@@ -1,20 +1,51 @@
 # app/api/follows.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from app.core.dependencies import get_current_user
-from app.services.follow_service import follow_service_object as follow_service
-from app.models.follow import FollowResponse, FollowersResponse, FollowingResponse
-from typing import Dict
+from app.services.follow_service import FollowService, UserNotFound, get_follow_service
+from app.models.follow import FollowResponse, BulkFollowRequest, BulkFollowResponse, FollowersResponse, FollowingResponse, RelationshipResponse, RelationshipsRequest, RelationshipsResponse
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/follows", tags=["Follows"])
 
+@router.post("/bulk", response_model=BulkFollowResponse)
+async def bulk_follow(
+    request: BulkFollowRequest,
+    current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service)
+):
+    """Follow (or unfollow, with follow=false) many users in one call"""
+    try:
+        return await follow_service.bulk_update(current_user['user_id'], request.user_ids, request.follow)
+    except UserNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/relationships", response_model=RelationshipsResponse)
+async def check_relationships(
+    request: RelationshipsRequest,
+    current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service)
+):
+    """Check relationship between current user and up to 100 users, e.g. every author on a feed page"""
+    try:
+        return await follow_service.check_relationships(current_user['user_id'], request.user_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/{user_id}", response_model=FollowResponse)
 async def follow_user(
     user_id: str,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service)
 ):
     """Follow a user"""
     try:
-        return follow_service.follow_user(current_user['user_id'], user_id)
+        return await follow_service.follow_user(current_user['user_id'], user_id)
+    except UserNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -22,11 +53,14 @@ async def follow_user(
 @router.delete("/{user_id}", response_model=FollowResponse)
 async def unfollow_user(
     user_id: str,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service)
 ):
     """Unfollow a user"""
     try:
-        return follow_service.unfollow_user(current_user['user_id'], user_id)
+        return await follow_service.unfollow_user(current_user['user_id'], user_id)
+    except UserNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -34,50 +68,67 @@ async def unfollow_user(
 @router.get("/followers", response_model=FollowersResponse)
 async def get_my_followers(
     current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     """Get current user's followers"""
-    result = follow_service.get_followers(current_user['user_id'], limit, offset)
-    return FollowersResponse(**result)
+    try:
+        return await follow_service.get_followers(current_user['user_id'], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/following", response_model=FollowingResponse)
 async def get_my_following(
     current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     """Get users that current user follows"""
-    result = follow_service.get_following(current_user['user_id'], limit, offset)
-    return FollowingResponse(**result)
+    try:
+        return await follow_service.get_following(current_user['user_id'], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/users/{user_id}/followers", response_model=FollowersResponse)
 async def get_user_followers(
     user_id: str,
+    follow_service: FollowService = Depends(get_follow_service),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     """Get a user's followers (public)"""
-    return follow_service.get_followers(user_id, limit, offset)
+    try:
+        return await follow_service.get_followers(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/users/{user_id}/following", response_model=FollowingResponse)
 async def get_user_following(
     user_id: str,
+    follow_service: FollowService = Depends(get_follow_service),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     """Get users that a user follows (public)"""
-    return follow_service.get_following(user_id, limit, offset)
+    try:
+        return await follow_service.get_following(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-# @router.get("/relationship/{target_id}", response_model=RelationshipResponse)
-# async def check_relationship(
-#     target_id: str,
-#     current_user: Dict = Depends(get_current_user)
-# ):
-#     """Check relationship between current user and target user"""
-#     result = follow_service.check_relationship(current_user['user_id'], target_id)
-#     return RelationshipResponse(**result)
\ No newline at end of file
+@router.get("/relationship/{target_id}", response_model=RelationshipResponse)
+async def check_relationship(
+    target_id: str,
+    current_user: Dict = Depends(get_current_user),
+    follow_service: FollowService = Depends(get_follow_service)
+):
+    """Check relationship between current user and target user"""
+    try:
+        return await follow_service.check_relationship(current_user['user_id'], target_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 import os
 
@@ -10,16 +11,33 @@ class Settings(BaseSettings):
     app_name: str = "Follow Service"
     port: int = 4001
 
-    ## supabase
-    supabase_url: str
-    supabase_service_key: str
+    ## postgres
+    postgres_url: str
+    postgres_pool_size: int = 20
+    postgres_max_overflow: int = 10
 
     ## redis
     redis_url: str
+    redis_max_connections: int = 50
+    redis_socket_timeout_seconds: float = 2.0
+    redis_socket_connect_timeout_seconds: float = 2.0
+    redis_health_check_interval_seconds: int = 30
+
+    ## follow counters
+    follow_counter_reconcile_seconds: int = 86400
+    follow_counter_reconcile_batch_size: int = 1000
+
+    ## following sets
+    follow_set_ttl_seconds: int = 3600
+    follow_set_ttl_jitter_seconds: int = 300
 
     ## jwt
-    jwt_secret_key: str
-    jwt_algorithm: str = "HS256"
+    jwt_secret_key: Optional[str] = None # legacy HS256 secret, tokens are now verified against userService's JWKS
+    jwks_url: str = "http://localhost:4000/.well-known/jwks.json"
+    jwks_refresh_seconds: int = 300
+    jwks_min_refresh_seconds: int = 30
+    jwks_timeout_seconds: float = 5.0
+    token_cache_max_entries: int = 10000
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+import json
+import uuid
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode the (created_at, id) of the last follows row in a page into an opaque cursor"""
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8').rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Decode an opaque cursor back into (created_at, id). Raises ValueError on a malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode('utf-8')))
+        return datetime.fromisoformat(raw["c"]), str(uuid.UUID(raw["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
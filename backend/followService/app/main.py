@@ -1,13 +1,50 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import logging
+
 from app.api import follows
+from app.db.postgres import PostgreSQLConnection
+from app.db.cache import RedisConnection
 from app.config import settings
+from app.core.token_cache import verified_token_cache
+from app.core.jwks import jwks_cache
+from app.services.follow_set_cache import follow_set_cache_obj
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    logger.info("Application starting...")
+    try:
+        await PostgreSQLConnection.initialize()
+        await RedisConnection.initialize()
+        await jwks_cache.start()
+        logger.info("All connections initialized")
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}", exc_info=True)
+        raise
+
+    yield
+
+    # Shutdown
+    logger.info("Application shutting down...")
+    try:
+        await jwks_cache.stop()
+        await PostgreSQLConnection.close()
+        await RedisConnection.close()
+        logger.info("All connections closed")
+    except Exception as e:
+        logger.error(f"Shutdown error: {str(e)}", exc_info=True)
 
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
-    description="Follow management service"
+    description="Follow management service",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -27,8 +64,13 @@ def root():
     return {"service": "Follow Service", "version": "1.0.0"}
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    """Health check endpoint"""
+    if not await PostgreSQLConnection.health_check():
+        return {"status": "unhealthy", "postgres": "down"}, 503
+    if not await RedisConnection.health_check():
+        return {"status": "unhealthy", "redis": "down"}, 503
+    return {"status": "healthy", "postgres": "up", "redis": "up", "token_cache": verified_token_cache.stats(), "follow_sets": follow_set_cache_obj.stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,6 +1,6 @@
 # app/models/follow.py
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class User(BaseModel):
@@ -11,13 +11,33 @@ class User(BaseModel):
 class FollowResponse(BaseModel):
     message: str
     following: bool
+    changed: bool = True
+
+class BulkFollowRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=100)
+    follow: bool = True
+
+class BulkFollowResponse(BaseModel):
+    following: bool
+    changed: List[str]
+    unchanged: List[str]
+    not_found: List[str] = []
 
 class FollowersResponse(BaseModel):
     followers: List[User]
+    next_cursor: Optional[str] = None
 
 class FollowingResponse(BaseModel):
     following: List[User]
+    next_cursor: Optional[str] = None
+
+class RelationshipResponse(BaseModel):
+    following: bool
+    followed_by: bool
+    mutual: bool
+
+class RelationshipsRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=100)
 
-# class RelationshipResponse(BaseModel):
-#     following: bool
-#     followed_by: bool
\ No newline at end of file
+class RelationshipsResponse(BaseModel):
+    relationships: Dict[str, RelationshipResponse]
\ No newline at end of file
@@ -0,0 +1,46 @@
+from app.db.postgres import PostgreSQLConnection
+from app.db.cache import RedisConnection
+from app.services.follow_counters import FollowCounters
+from app.config import settings
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+async def reconcile() -> None:
+    async with PostgreSQLConnection.get_session_factory()() as session:
+        await FollowCounters(session).reconcile()
+
+async def main(once: bool) -> None:
+    """
+    Counts are kept in step by the follow path, in the same transaction as the edges. This job only
+    repairs drift (manual edits, restores), recomputing every count each follow_counter_reconcile_seconds
+    """
+    await PostgreSQLConnection.initialize()
+    await RedisConnection.initialize()
+    try:
+        while True:
+            try:
+                await reconcile()
+            except Exception as e:
+                logger.error(f"Follow counter reconcile failed: {str(e)}", exc_info=True)
+                if once:
+                    raise
+            if once:
+                return
+            await asyncio.sleep(settings.follow_counter_reconcile_seconds)
+    finally:
+        await RedisConnection.close()
+        await PostgreSQLConnection.close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Reconcile users.followers_count and following_count with follows")
+    parser.add_argument("--reconcile", action="store_true", help="Reconcile once and exit")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.reconcile))
+    except KeyboardInterrupt:
+        logger.info("Follow counter job stopped")
@@ -0,0 +1,45 @@
+from app.db.postgres import PostgreSQLConnection
+from sqlalchemy import text
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+async def main(batch_size: int) -> None:
+    """
+    One-off migration for follows.created_at: backfill NULLs in batches, then make the column
+    NOT NULL DEFAULT now() to match the model. Follower list cursors can not represent a NULL
+    created_at, rows with one were skipped by every page after the first
+    """
+    await PostgreSQLConnection.initialize()
+    try:
+        engine = PostgreSQLConnection.get_engine()
+        total = 0
+        while True:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    text(
+                        "UPDATE follows SET created_at = 'epoch'::timestamptz "
+                        "WHERE id IN (SELECT id FROM follows WHERE created_at IS NULL LIMIT :limit)"
+                    ),
+                    {"limit": batch_size}
+                )
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        logger.info(f"Backfilled created_at on {total} follows")
+        async with engine.begin() as conn:
+            await conn.execute(text("ALTER TABLE follows ALTER COLUMN created_at SET DEFAULT now()"))
+            await conn.execute(text("ALTER TABLE follows ALTER COLUMN created_at SET NOT NULL"))
+        logger.info("follows.created_at is now NOT NULL DEFAULT now()")
+    finally:
+        await PostgreSQLConnection.close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Backfill follows.created_at and make it NOT NULL")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows updated per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,44 @@
+from app.db.postgres import PostgreSQLConnection
+from sqlalchemy import text
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+## Keyset pages of followers and following, ordered by (created_at, id) within one user
+INDEXES = {
+    "ix_follows_following_id_created_at_id": "(following_id, created_at, id)",
+    "ix_follows_follower_id_created_at_id": "(follower_id, created_at, id)",
+}
+
+async def main() -> None:
+    """
+    One-off migration for the composite indexes behind follower and following list pagination.
+    Built CONCURRENTLY so follow writes are not blocked, which can not run inside a transaction.
+    An index left INVALID by an interrupted build is dropped and built again
+    """
+    await PostgreSQLConnection.initialize()
+    try:
+        engine = PostgreSQLConnection.get_engine()
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for name, columns in INDEXES.items():
+                valid = await conn.scalar(
+                    text(
+                        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                        "WHERE c.relname = :name"
+                    ),
+                    {"name": name}
+                )
+                if valid is False:
+                    logger.info(f"Dropping invalid index {name}")
+                    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON follows {columns}"))
+                logger.info(f"{name} is in place")
+    finally:
+        await PostgreSQLConnection.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+from app.db.postgres import PostgreSQLConnection
+from sqlalchemy import text
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CONSTRAINT_NAME = "follows_follower_id_following_id_key"
+
+## Every copy of an edge but the earliest
+DELETE_DUPLICATES = text(
+    "DELETE FROM follows WHERE id IN ("
+    "SELECT id FROM ("
+    "SELECT id, row_number() OVER (PARTITION BY follower_id, following_id ORDER BY created_at, id) AS copy "
+    "FROM follows"
+    ") edges WHERE copy > 1 LIMIT :limit)"
+)
+
+async def main(batch_size: int) -> None:
+    """
+    One-off migration for the (follower_id, following_id) unique constraint that the follow path's
+    ON CONFLICT DO NOTHING relies on: delete duplicate edges in batches, keeping the earliest, then add
+    the constraint. The last pass runs under a lock with the ALTER, so no duplicate can slip in between
+    """
+    await PostgreSQLConnection.initialize()
+    try:
+        engine = PostgreSQLConnection.get_engine()
+        async with engine.begin() as conn:
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": CONSTRAINT_NAME}
+            )
+        if exists:
+            logger.info(f"{CONSTRAINT_NAME} already exists")
+            return
+        total = 0
+        while True:
+            async with engine.begin() as conn:
+                result = await conn.execute(DELETE_DUPLICATES, {"limit": batch_size})
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        async with engine.begin() as conn:
+            ## Blocks follow writes, not reads, until the constraint is in place
+            await conn.execute(text("LOCK TABLE follows IN SHARE ROW EXCLUSIVE MODE"))
+            result = await conn.execute(DELETE_DUPLICATES, {"limit": None})
+            total += result.rowcount
+            await conn.execute(
+                text(f"ALTER TABLE follows ADD CONSTRAINT {CONSTRAINT_NAME} UNIQUE (follower_id, following_id)")
+            )
+        logger.info(f"Deleted {total} duplicate follows, {CONSTRAINT_NAME} added")
+        if total:
+            ## Duplicates were counted in users.followers_count and following_count
+            logger.info("Run python -m app.script.follow_counters --reconcile to repair the counts")
+    finally:
+        await PostgreSQLConnection.close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Delete duplicate follows and add the (follower_id, following_id) unique constraint")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows deleted per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,114 @@
+# app/services/follow_counters.py
+from app.models.db_models import User, Follow
+from app.db.cache import invalidate_user_profiles
+from app.config import settings
+
+from typing import List, Set
+from sqlalchemy import update, select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class FollowCounters():
+    """
+    users.followers_count / following_count maintenance.
+    apply() runs inside the follow path's transaction, so counts move atomically with the edges;
+    reconcile() recomputes every count from follows in bulk to repair any drift.
+    """
+    def __init__(
+            self,
+            db_session: AsyncSession
+    ):
+        self._db_session = db_session
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def lock(self, user_ids: List[uuid.UUID]) -> Set[uuid.UUID]:
+        """
+        Row-lock the users rows an update will touch, always in id order. Two users following each other
+        back at the same moment would otherwise lock the same two rows in opposite order and deadlock.
+        FOR NO KEY UPDATE does not conflict with the KEY SHARE locks taken by the follows foreign keys.
+        Returns the ids that exist
+        """
+        result = await self._db_session.execute(
+            select(User.id)
+                .where(User.id.in_(user_ids))
+                .order_by(User.id)
+                .with_for_update(key_share=True)
+        )
+        return set(result.scalars().all())
+
+    async def apply(
+            self,
+            follower_id: uuid.UUID,
+            following_ids: List[uuid.UUID],
+            delta: int
+    ) -> None:
+        """
+        Apply follows (+1) or unfollows (-1) from follower_id to both sides of every edge.
+        The rows must already be held through lock()
+        """
+        if not following_ids:
+            return
+        await self._db_session.execute(
+            update(User)
+                .where(User.id == follower_id)
+                .values(following_count=func.coalesce(User.following_count, 0) + delta * len(following_ids))
+        )
+        await self._db_session.execute(
+            update(User)
+                .where(User.id.in_(following_ids))
+                .values(followers_count=func.coalesce(User.followers_count, 0) + delta)
+        )
+
+    async def _reconcile_batch(self, user_ids: List[uuid.UUID]) -> List[str]:
+        """Recompute both counts for one batch of users, only rows that drifted are written"""
+        await self.lock(user_ids)
+        followers = select(func.count()).select_from(Follow) \
+            .where(Follow.following_id == User.id).correlate(User).scalar_subquery()
+        following = select(func.count()).select_from(Follow) \
+            .where(Follow.follower_id == User.id).correlate(User).scalar_subquery()
+        result = await self._db_session.execute(
+            update(User)
+                .where(User.id.in_(user_ids))
+                .where(or_(
+                    User.followers_count.is_distinct_from(followers),
+                    User.following_count.is_distinct_from(following)
+                ))
+                .values(followers_count=followers, following_count=following)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+        )
+        corrected = [str(user_id) for user_id in result.scalars().all()]
+        await self._db_session.commit()
+        return corrected
+
+    async def reconcile(self, batch_size: int = None) -> int:
+        """
+        Recompute both counts for every user from follows, walking users by id in keyset batches of
+        follow_counter_reconcile_batch_size. Each batch is its own short transaction, so the follow path
+        is only ever blocked on one batch's rows and no statement runs into the command timeout.
+        Each count is an index-only count on the (follower_id / following_id, ...) indexes.
+        Returns the number of users corrected
+        """
+        batch_size = batch_size or settings.follow_counter_reconcile_batch_size
+        total = 0
+        last_id = None
+        while True:
+            query = select(User.id).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            user_ids = list((await self._db_session.execute(query)).scalars().all())
+            if not user_ids:
+                break
+            corrected = await self._reconcile_batch(user_ids)
+            if corrected:
+                await invalidate_user_profiles(*corrected)
+            total += len(corrected)
+            last_id = user_ids[-1]
+            if len(user_ids) < batch_size:
+                break
+        logger.info(f"Reconciled follow counters, corrected {total} users")
+        return total
@@ -1,108 +1,273 @@
 # app/services/follow_service.py
-from app.db.database import get_db
-from app.db.cache import get_redis
-from app.models.follow import FollowResponse, FollowersResponse, FollowingResponse, User
-from typing import Optional, List, Dict
+from app.db.postgres import get_db_session
+from app.db.cache import invalidate_user_profiles
+from app.models.db_models import User as UserRow, Follow
+from app.services.follow_counters import FollowCounters
+from app.services.follow_set_cache import follow_set_cache_obj
+from app.models.follow import FollowResponse, BulkFollowResponse, FollowersResponse, FollowingResponse, RelationshipResponse, RelationshipsResponse, User
+from app.core.pagination import encode_cursor, decode_cursor
+from typing import Optional, List, Dict, Tuple
+from fastapi import Depends
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from redis.exceptions import RedisError
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class UserNotFound(ValueError):
+    """A user on either side of a follow does not exist"""
 
 class FollowService():
-    def __init__(self):
-        self.db = get_db()
-        # self.redis = get_redis()
+## CONSTRUCTOR----------------------------------------------------------------------
+
+    def __init__(
+            self,
+            db_session: AsyncSession
+    ):
+        self._db_session = db_session
+        self._counters = FollowCounters(db_session)
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    @staticmethod
+    def _to_uuid(user_id: str) -> uuid.UUID:
+        try:
+            return uuid.UUID(str(user_id))
+        except ValueError:
+            raise ValueError(f"Invalid user id: {user_id}")
+
+    @classmethod
+    def _canonical(cls, user_id: str) -> str:
+        """Lowercase hyphenated form, the one stored in Redis sets and returned by the database"""
+        return str(cls._to_uuid(user_id))
+
+    async def _insert_follows(self, follower_id: uuid.UUID, following_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """
+        One insert against the unique (follower_id, following_id) constraint. Existing edges are
+        left alone (ON CONFLICT DO NOTHING), so only newly created rows come back
+        """
+        result = await self._db_session.execute(
+            insert(Follow)
+                .values([{"follower_id": follower_id, "following_id": following_id} for following_id in following_ids])
+                .on_conflict_do_nothing(index_elements=[Follow.follower_id, Follow.following_id])
+                .returning(Follow.following_id)
+        )
+        return list(result.scalars().all())
+
+    async def _delete_follows(self, follower_id: uuid.UUID, following_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """One delete, only rows that existed come back"""
+        result = await self._db_session.execute(
+            delete(Follow)
+                .where(Follow.follower_id == follower_id, Follow.following_id.in_(following_ids))
+                .returning(Follow.following_id)
+        )
+        return list(result.scalars().all())
+
+    async def _update(self, follower_id: uuid.UUID, following_ids: List[uuid.UUID], follow: bool) -> Tuple[List[uuid.UUID], List[uuid.UUID]]:
+        """
+        Change the edges and both sides' counts in one transaction. Committed here rather than by
+        get_db_session so cached profiles are invalidated only once the new counts are visible.
+        Returns (changed, not found) target ids. Ids with no users row are skipped rather than left
+        to fail the follows foreign key, which would abort the whole batch
+        """
+        try:
+            existing = await self._counters.lock([follower_id, *following_ids])
+            if follower_id not in existing:
+                raise UserNotFound("User not found")
+            missing = [user_id for user_id in following_ids if user_id not in existing]
+            following_ids = [user_id for user_id in following_ids if user_id in existing]
+            changed = []
+            if following_ids and follow:
+                changed = await self._insert_follows(follower_id, following_ids)
+            elif following_ids:
+                changed = await self._delete_follows(follower_id, following_ids)
+            await self._counters.apply(follower_id, changed, 1 if follow else -1)
+            await self._db_session.commit()
+        except UserNotFound:
+            await self._db_session.rollback()
+            raise
+        except IntegrityError as e:
+            ## The locked rows can not be deleted under us, so this should not happen
+            await self._db_session.rollback()
+            logger.warning(f"Follow update for {follower_id} violated a constraint: {str(e)}")
+            raise UserNotFound("User not found")
+        except Exception as e:
+            await self._db_session.rollback()
+            logger.error(f"Failed to update follows for {follower_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Database error: {str(e)}")
+        if changed:
+            await invalidate_user_profiles(str(follower_id), *(str(user_id) for user_id in changed))
+            await follow_set_cache_obj.apply(str(follower_id), [str(user_id) for user_id in changed], follow)
+        return changed, missing
+
+    async def _get_following_ids(self, user_id: str) -> List[str]:
+        """Everyone user_id follows, an index-only scan of the (follower_id, following_id) unique index"""
+        result = await self._db_session.execute(
+            select(Follow.following_id).where(Follow.follower_id == self._to_uuid(user_id))
+        )
+        return [str(following_id) for following_id in result.scalars().all()]
+
+    async def _get_followed_by(self, user_id: str, target_ids: List[str]) -> List[str]:
+        """Which of target_ids follow user_id, one probe of the unique index per target"""
+        result = await self._db_session.execute(
+            select(Follow.follower_id).where(
+                Follow.following_id == self._to_uuid(user_id),
+                Follow.follower_id.in_([self._to_uuid(target_id) for target_id in target_ids])
+            )
+        )
+        return [str(follower_id) for follower_id in result.scalars().all()]
+
+    async def _get_users(self, user_ids: List[uuid.UUID]) -> Dict[uuid.UUID, User]:
+        """Profile fields for a page of ids in one query"""
+        if not user_ids:
+            return {}
+        result = await self._db_session.execute(
+            select(UserRow.id, UserRow.full_name, UserRow.user_name).where(UserRow.id.in_(user_ids))
+        )
+        return {
+            row.id: User(user_id=str(row.id), full_name=row.full_name, user_name=row.user_name)
+            for row in result
+        }
+
+    async def _get_edges(self, match_column, user_id: str, other_column, cursor: Optional[str], limit: int) -> Tuple[List[User], Optional[str]]:
+        """
+        Keyset page of follows ordered by (created_at, id) desc. The cursor is the last row of the previous
+        page, so every page is one seek on the (match_column, created_at, id) index however deep it is
+        """
+        position = decode_cursor(cursor)
+        query = select(Follow.id, other_column.label("other_id"), Follow.created_at) \
+            .where(match_column == self._to_uuid(user_id))
+        if position:
+            last_created_at, last_id = position
+            query = query.where(tuple_(Follow.created_at, Follow.id) < tuple_(last_created_at, uuid.UUID(last_id)))
+        query = query.order_by(Follow.created_at.desc(), Follow.id.desc()).limit(limit)
+        rows = (await self._db_session.execute(query)).all()
+
+        users = await self._get_users([row.other_id for row in rows])
+        page = [users[row.other_id] for row in rows if row.other_id in users]
+
+        ## A short page means the list is exhausted
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1].created_at, str(rows[-1].id))
+        return page, next_cursor
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
 
-    def follow_user(self, follower_id: str, following_id: str) -> FollowResponse:
-        """Follow a user"""
+    async def follow_user(self, follower_id: str, following_id: str) -> FollowResponse:
+        """Follow a user. Idempotent, changed is False when the user was already followed"""
+
+        follower_id, following_id = self._canonical(follower_id), self._canonical(following_id)
 
         # Check not following self
         if follower_id == following_id:
             raise ValueError("Cannot follow yourself")
         
-        # Check if already following
-        existing = self.db.table('follows').select("id").eq(
-            'follower_id', follower_id
-        ).eq('following_id', following_id).execute()
-        
-        if existing.data:
-            raise ValueError("Already following this user")
-        
-        # # Invalidate the cache
-        # print("User deleted from cache") if self.redis.delete(f"user:{follower_id}") else None
-        #
-        
-        # Create follow relationship
-        result = self.db.table('follows').insert({
-            'follower_id': follower_id,
-            'following_id': following_id
-        }).execute()
+        # Create follow relationship, a no-op if it already exists
+        created, missing = await self._update(self._to_uuid(follower_id), [self._to_uuid(following_id)], follow=True)
+        if missing:
+            raise UserNotFound("User not found")
         
         return FollowResponse(
-            message="Successfully followed user",
-            following= bool(result.data)
+            message="Successfully followed user" if created else "Already following this user",
+            following=True,
+            changed=bool(created)
         )
         
 
-    def unfollow_user(self, follower_id: str, following_id: str) -> FollowResponse:
-        """Unfollow a user"""
+    async def unfollow_user(self, follower_id: str, following_id: str) -> FollowResponse:
+        """Unfollow a user. Idempotent, changed is False when the user was not followed"""
 
-        # Invalidate the cache
-        print("User deleted from cache") if self.redis.delete(f"user:{follower_id}") else None
-        
         # Delete follow relationship
-        result = self.db.table('follows').delete().eq(
-            'follower_id', follower_id
-        ).eq('following_id', following_id).execute()
-        
-        if not result.data:
-            raise ValueError("Not following this user")
+        deleted, _ = await self._update(self._to_uuid(follower_id), [self._to_uuid(following_id)], follow=False)
         
         return FollowResponse(
-            message="Successfully unfollowed user",
-            following= not bool(result.data) 
+            message="Successfully unfollowed user" if deleted else "Not following this user",
+            following=False,
+            changed=bool(deleted)
         )
 
+    async def bulk_update(self, follower_id: str, following_ids: List[str], follow: bool) -> BulkFollowResponse:
+        """Follow or unfollow many users with a single insert or delete"""
+        follower_id = self._canonical(follower_id)
+        following_ids = [user_id for user_id in dict.fromkeys(map(self._canonical, following_ids)) if user_id != follower_id]
+        if not following_ids:
+            raise ValueError("No users to update")
 
-    def get_followers(self, user_id: str, limit: int = 50, offset: int = 0) -> FollowersResponse:
-        """Get list of followers for a user"""
-
-        # Get followers with user info
-        result = self.db.table('follows').select(
-            'users!follows_follower_id_fkey(id, full_name, user_name)'
-        ).eq('following_id', user_id).range(offset, offset + limit - 1).execute()
-
-        followers = []
-        if result.data:
-            for item in result.data:
-                user_info = item.get('users', {})
-                followers.append(User(
-                    user_id=user_info.get['id'],
-                    full_name=user_info.get('full_name'),
-                    user_name=user_info.get('user_name')
-                ))
-            
-        return FollowersResponse(
-            followers=followers
+        changed, missing = await self._update(
+            self._to_uuid(follower_id),
+            [self._to_uuid(user_id) for user_id in following_ids],
+            follow=follow
         )
 
+        changed_ids = {str(user_id) for user_id in changed}
+        missing_ids = {str(user_id) for user_id in missing}
+        return BulkFollowResponse(
+            following=follow,
+            changed=[user_id for user_id in following_ids if user_id in changed_ids],
+            unchanged=[user_id for user_id in following_ids if user_id not in changed_ids and user_id not in missing_ids],
+            not_found=[user_id for user_id in following_ids if user_id in missing_ids]
+        )
 
-    def get_following(self, user_id: str, limit: int = 50, offset: int = 0) -> FollowingResponse:
-        """Get list of users that a user follows"""
-        
-        # Get following with user info
-        result = self.db.table('follows').select(
-            'users!follows_following_id_fkey(id, full_name, user_name)'
-        ).eq('follower_id', user_id).range(offset, offset + limit - 1).execute()
-        
-        following = []
-        if result.data:
-            for item in result.data:
-                user_info = item.get('users', {})
-                following.append(User(
-                    user_id=user_info.get('id'),
-                    full_name=user_info.get('full_name'),
-                    user_name=user_info.get('user_name')
-                ))
 
+    async def get_followers(self, user_id: str, limit: int = 50, cursor: Optional[str] = None) -> FollowersResponse:
+        """Get list of followers for a user, newest first"""
+        followers, next_cursor = await self._get_edges(Follow.following_id, user_id, Follow.follower_id, cursor, limit)
+        return FollowersResponse(
+            followers=followers,
+            next_cursor=next_cursor
+        )
+
+
+    async def get_following(self, user_id: str, limit: int = 50, cursor: Optional[str] = None) -> FollowingResponse:
+        """Get list of users that a user follows, newest first"""
+        following, next_cursor = await self._get_edges(Follow.follower_id, user_id, Follow.following_id, cursor, limit)
         return FollowingResponse(
-            following=following
+            following=following,
+            next_cursor=next_cursor
+        )
+
+
+    async def check_relationships(self, viewer_id: str, target_ids: List[str]) -> RelationshipsResponse:
+        """Relationship between the viewer and every target, served from the cached following sets"""
+        ## Compare canonical ids, but key the response by the ids as the caller sent them
+        viewer_id = self._canonical(viewer_id)
+        requested = {target_id: self._canonical(target_id) for target_id in target_ids}
+        target_ids = list(dict.fromkeys(requested.values()))
+
+        try:
+            following, followed_by = await follow_set_cache_obj.check(
+                viewer_id, target_ids, self._get_following_ids, self._get_followed_by
+            )
+        except RedisError as e:
+            logger.warning(f"Following set cache unavailable, checking relationships in the database: {str(e)}")
+            following = set(await self._get_following_ids(viewer_id)) & set(target_ids)
+            followed_by = set(await self._get_followed_by(viewer_id, target_ids))
+
+        return RelationshipsResponse(
+            relationships={
+                requested_id: RelationshipResponse(
+                    following=target_id in following,
+                    followed_by=target_id in followed_by,
+                    mutual=target_id in following and target_id in followed_by
+                )
+                for requested_id, target_id in requested.items()
+            }
         )
 
-follow_service_object = FollowService()
\ No newline at end of file
+    async def check_relationship(self, viewer_id: str, target_id: str) -> RelationshipResponse:
+        """Relationship between the viewer and one target"""
+        result = await self.check_relationships(viewer_id, [target_id])
+        return result.relationships[target_id]
+
+
+# Factory pattern function
+def get_follow_service(
+    db_session: AsyncSession = Depends(get_db_session)
+) -> FollowService:
+    """Create new instance per request"""
+    return FollowService(db_session=db_session)
@@ -0,0 +1,148 @@
+# app/services/follow_set_cache.py
+from app.db.cache import get_redis
+from app.config import settings
+
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+FollowingLoader = Callable[[str], Awaitable[List[str]]]
+FollowedByLoader = Callable[[str, List[str]], Awaitable[List[str]]]
+
+## Member present in every cached set, so a cached user who follows nobody is told apart from a cold key
+LOADED_MARKER = "_"
+
+## Rebuild a set only if no follow write landed while it was being loaded
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 3, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+## Bump the generation and patch the set in place when it is cached
+## feedService keys its pull_following cache on the generation, bumping it also retires that entry
+APPLY_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if ARGV[1] == '1' then
+    redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+else
+    redis.call('SREM', KEYS[1], unpack(ARGV, 3))
+end
+return 1
+"""
+
+class FollowSetCache():
+    """
+    Per-user following sets in Redis (following:{user_id}), answering "does A follow B" for a whole
+    batch of targets with SMISMEMBER. A cold set is loaded in full from follows on first use and then
+    patched by the follow path after every commit.
+
+    Each set has a generation key bumped by every write. A rebuild only stores its snapshot if the
+    generation is unchanged, so a follow committed mid-rebuild can not be lost from the set.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    ## Client is created in the app lifespan, so resolve it lazily
+    @property
+    def redis(self):
+        return get_redis()
+
+    ## Hash tag keeps a set and its generation in the same cluster slot
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"following:{{{user_id}}}"
+
+    @staticmethod
+    def _generation_key(user_id: str) -> str:
+        return f"following:{{{user_id}}}:gen"
+
+    @staticmethod
+    def _ttl() -> int:
+        return settings.follow_set_ttl_seconds + random.randint(0, settings.follow_set_ttl_jitter_seconds)
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    async def _rebuild(self, user_id: str, load_following: FollowingLoader) -> Set[str]:
+        generation = await self.redis.get(self._generation_key(user_id))
+        following = await load_following(user_id)
+        await self.redis.eval(
+            STORE_SCRIPT, 2, self._key(user_id), self._generation_key(user_id),
+            generation.decode() if generation else "", self._ttl(), LOADED_MARKER, *following
+        )
+        return set(following)
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def check(
+            self,
+            viewer_id: str,
+            target_ids: List[str],
+            load_following: FollowingLoader,
+            load_followed_by: FollowedByLoader
+    ) -> Tuple[Set[str], Set[str]]:
+        """
+        Returns (targets viewer follows, targets following viewer). Both come from one pipelined round
+        trip when the sets are cached: SMISMEMBER on the viewer's set, SISMEMBER-style probes of each
+        target's set for the viewer. Uncached sides fall back to one query each.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.smismember(self._key(viewer_id), [LOADED_MARKER, *target_ids])
+        for target_id in target_ids:
+            pipe.smismember(self._key(target_id), [LOADED_MARKER, viewer_id])
+        viewer_flags, *target_flags = await pipe.execute()
+
+        if viewer_flags[0]:
+            self.hits += 1
+            following = {target_id for target_id, member in zip(target_ids, viewer_flags[1:]) if member}
+        else:
+            self.misses += 1
+            following = await self._rebuild(viewer_id, load_following) & set(target_ids)
+
+        followed_by = set()
+        cold = []
+        for target_id, (loaded, member) in zip(target_ids, target_flags):
+            if not loaded:
+                cold.append(target_id)
+            elif member:
+                followed_by.add(target_id)
+        ## Targets' sets are not built here, a feed page full of popular authors would load all of them
+        if cold:
+            followed_by.update(await load_followed_by(viewer_id, cold))
+        return following, followed_by
+
+    async def apply(self, follower_id: str, following_ids: List[str], follow: bool) -> None:
+        """Add (follow) or remove (unfollow) following_ids in follower_id's set, if cached"""
+        if not following_ids:
+            return
+        try:
+            await self.redis.eval(
+                APPLY_SCRIPT, 2, self._key(follower_id), self._generation_key(follower_id),
+                1 if follow else 0, settings.follow_set_ttl_seconds + settings.follow_set_ttl_jitter_seconds,
+                *following_ids
+            )
+        except Exception as e:
+            ## The set expires with its TTL
+            logger.warning(f"Failed to update following set of {follower_id}: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+follow_set_cache_obj = FollowSetCache()
@@ -0,0 +1,84 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+import asyncio
+import uuid
+
+from app.models.follow import User
+from app.services.follow_service import FollowService
+
+class FakeResult():
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+class FakeSession():
+    """Records each statement and answers it with the next canned set of rows"""
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0))
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+def _rows(count: int):
+    created_at = datetime(2024, 5, 17, 12, 0, 0, tzinfo=timezone.utc)
+    return [SimpleNamespace(id=uuid.uuid4(), other_id=uuid.uuid4(), created_at=created_at) for _ in range(count)]
+
+def _service(session: FakeSession) -> FollowService:
+    service = FollowService(session)
+    async def get_users(user_ids):
+        return {user_id: User(user_id=str(user_id), full_name="Name", user_name="name") for user_id in user_ids}
+    service._get_users = get_users
+    return service
+
+def test_first_page_seeks_newest_first():
+    session = FakeSession(_rows(2))
+    followers = asyncio.run(_service(session).get_followers(str(uuid.uuid4()), limit=2))
+
+    sql = _sql(session.statements[0])
+    assert "WHERE follows.following_id = " in sql
+    assert "(follows.created_at, follows.id) <" not in sql
+    assert "ORDER BY follows.created_at DESC, follows.id DESC" in sql
+    assert len(followers.followers) == 2
+
+def test_next_cursor_continues_after_the_last_row():
+    """A full page hands out a cursor, the next page seeks strictly past that page's last row"""
+    first = _rows(2)
+    session = FakeSession(first, [])
+    service = _service(session)
+    user_id = str(uuid.uuid4())
+
+    page = asyncio.run(service.get_following(user_id, limit=2))
+    assert page.next_cursor is not None
+    asyncio.run(service.get_following(user_id, limit=2, cursor=page.next_cursor))
+
+    statement = session.statements[1]
+    assert "WHERE follows.follower_id = " in _sql(statement)
+    assert "(follows.created_at, follows.id) < (" in _sql(statement)
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert first[-1].created_at in params.values()
+    assert first[-1].id in params.values()
+
+def test_short_page_has_no_next_cursor():
+    session = FakeSession(_rows(1))
+    page = asyncio.run(_service(session).get_followers(str(uuid.uuid4()), limit=2))
+    assert page.next_cursor is None
+
+def test_malformed_cursor_raises_value_error():
+    session = FakeSession()
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(_service(session).get_followers(str(uuid.uuid4()), limit=2, cursor="not-a-cursor!"))
+    assert session.statements == []
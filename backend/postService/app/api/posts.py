@@ -1,9 +1,11 @@
-from app.models.post import PostData, Post, PostUploadResponse, PostFetchResponse, PostDeleteResponse
+from app.models.post import PostData, Post, PostUploadResponse, PostFetchResponse, PostPage, PostDeleteResponse
 from app.services.post_service import PostService, get_post_service
 from app.core.dependencies import get_current_user
+from app.core.uploads import UploadTooLarge
+from app.config import settings
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form
-from typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, status
+from typing import Dict, Optional
 import json
 import logging
 
@@ -19,21 +21,37 @@ async def upload_post(
     current_user: Dict = Depends(get_current_user),
     post_service_obj: PostService = Depends(get_post_service) ## Dependency injection so that every request gets its own post service object and we do not share state btw requests
     ):
-    file_data = await file.read()
+    ## Starlette has already spooled the upload, reject oversized files before streaming them to storage
+    if file.size is not None and file.size > settings.max_upload_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
     file_extension = file.filename.split('.')[-1]
     json_data = json.loads(data)
     caption = json_data.get("caption", "")
     user_id = current_user['user_id']
-    result = await post_service_obj.upload_post(PostData(image_data=file_data, file_extension=file_extension, caption=caption), user_id=user_id)
+    try:
+        result = await post_service_obj.upload_post(PostData(image_file=file.file, file_extension=file_extension, caption=caption), user_id=user_id)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     logger.info(f"Post {result.post_id} uploaded successfully")
     return result
 
-@router.get("/get_post/{user_id}", response_model=list[PostFetchResponse])
+@router.get("/get_post/{user_id}", response_model=PostPage)
 async def get_post(
     user_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    page_size: int = Query(settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
     post_service_obj: PostService = Depends(get_post_service)
 ):
-    return await post_service_obj.get_post(user_id=user_id)
+    """
+    One page of a user's posts, newest first. Returns a PostPage ({posts, next_cursor}) rather than
+    a bare list, pass next_cursor back as cursor to fetch the following page
+    """
+    try:
+        return await post_service_obj.get_post(user_id=user_id, cursor=cursor, page_size=page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/delete_post/{post_id}", response_model=PostDeleteResponse)
 async def delete_post(
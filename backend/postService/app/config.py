@@ -1,6 +1,7 @@
 # app/config.py
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
+from typing import List, Optional
 import os
 
 # Explicitly load .env file BEFORE creating Settings
@@ -16,6 +17,19 @@ class Settings(BaseSettings):
     supabase_service_key: str
     supabase_storage_bucket: str = "user_images"
 
+    ## uploads
+    max_upload_bytes: int = 10 * 1024 * 1024
+    upload_chunk_size: int = 64 * 1024
+
+    ## profile posts
+    posts_page_size: int = 12
+    posts_max_page_size: int = 60
+
+    ## image variants
+    image_variant_sizes: List[int] = [150, 640, 1080]
+    image_variant_formats: List[str] = ["webp", "jpeg"]
+    image_workers: int = 2
+
     #postgres
     postgres_url: str
     postgres_pool_size: int = 20
@@ -23,15 +37,35 @@ class Settings(BaseSettings):
 
     ## redis
     redis_url: str
+    redis_max_connections: int = 50
+    redis_socket_timeout_seconds: float = 2.0
+    redis_socket_connect_timeout_seconds: float = 2.0
+    redis_health_check_interval_seconds: int = 30
 
     ## mongo
     mongo_url: str
 
+    ## feed fan-out
+    fanout_follower_threshold: int = 10000
+    fanout_pull_hysteresis: int = 1000 # pull authors return to fan-out only below threshold - hysteresis
+    fanout_async: bool = True
+    fanout_chunk_size: int = 1000
+    fanout_inflight_chunks: int = 4
+    fanout_lease_seconds: int = 300
+    fanout_max_attempts: int = 5
+    fanout_retry_backoff_seconds: int = 5
+    fanout_max_backoff_seconds: int = 60
+    fanout_poll_interval_seconds: float = 1.0
+
     ## jwt
-    jwt_secret_key: str
-    jwt_algorithm: str = "HS256"
+    jwt_secret_key: Optional[str] = None # legacy HS256 secret, tokens are now verified against userService's JWKS
+    jwks_url: str = "http://localhost:4000/.well-known/jwks.json"
+    jwks_refresh_seconds: int = 300
+    jwks_min_refresh_seconds: int = 30
+    jwks_timeout_seconds: float = 5.0
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
+    token_cache_max_entries: int = 10000
     
     class Config:
         env_file = ".env"
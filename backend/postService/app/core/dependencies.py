@@ -2,18 +2,23 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from app.config import settings
+from app.core.token_cache import verified_token_cache
+from app.core.jwks import jwks_cache
 from typing import Dict
 
 security = HTTPBearer()
 
-def verify_token(token: str) -> Dict:
-    """Verify JWT token from user service"""
+async def verify_token(token: str) -> Dict:
+    """Verify JWT token from user service against its published signing keys"""
     try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await jwks_cache.get(kid)
+        if signing_key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
         payload = jwt.decode(
             token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
+            signing_key.key,
+            algorithms=[signing_key.algorithm_name]
         )
         return payload
     except jwt.ExpiredSignatureError:
@@ -30,14 +35,18 @@ def verify_token(token: str) -> Dict:
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
     """Get current user from JWT token"""
     token = credentials.credentials
-    payload = verify_token(token)
+    # Tokens seen before are served from the verified-token cache until they expire
+    payload = verified_token_cache.get(token)
+    if payload is None:
+        payload = await verify_token(token)
     
-    # Check if it's an access token
-    if payload.get("type") != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type"
-        )
+        # Check if it's an access token
+        if payload.get("type") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type"
+            )
+        verified_token_cache.put(token, payload)
     return {
         "user_id": payload.get("user_id"),
         "user_name": payload.get("user_name")
@@ -0,0 +1,81 @@
+# app/core/jwks.py
+from app.config import settings
+
+from typing import Dict, Optional
+import asyncio
+import httpx
+import jwt
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class KeySetCache():
+    """
+    userService's published JWKS, cached in process and refreshed in the background so token
+    verification stays local. userService publishes the next rotation key ahead of time, so an
+    unknown kid is rare; it triggers one rate-limited refresh before the token is rejected.
+    """
+    def __init__(self):
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._last_refresh = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        async with httpx.AsyncClient(timeout=settings.jwks_timeout_seconds) as client:
+            response = await client.get(settings.jwks_url)
+            response.raise_for_status()
+        keys = {}
+        for jwk in response.json().get("keys", []):
+            try:
+                keys[jwk["kid"]] = jwt.PyJWK(jwk)
+            except (KeyError, jwt.PyJWKError) as e:
+                logger.warning(f"Skipping unusable JWKS entry: {str(e)}")
+        self._keys = keys
+        self._last_refresh = time.monotonic()
+        logger.info(f"Loaded {len(keys)} signing keys from JWKS")
+
+    async def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        key = self._keys.get(kid)
+        if key is not None or kid is None:
+            return key
+        async with self._refresh_lock:
+            ## Rate limited so tokens with made-up kids cannot hammer userService
+            if time.monotonic() - self._last_refresh > settings.jwks_min_refresh_seconds:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    self._last_refresh = time.monotonic()
+                    logger.warning(f"JWKS refresh failed: {str(e)}")
+        return self._keys.get(kid)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.jwks_refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                ## Keep verifying with the keys we have
+                logger.warning(f"JWKS refresh failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Initial load plus the background refresher. userService being down is not fatal, the refresher retries"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Initial JWKS load failed: {str(e)}")
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+
+jwks_cache = KeySetCache()
@@ -0,0 +1,84 @@
+import logging
+from typing import Optional
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class RedisConnection:
+    """Singleton async Redis client backed by a shared connection pool"""
+    _client: Optional[redis.Redis] = None
+    _initialized: bool = False
+
+    @classmethod
+    async def initialize(cls):
+        """Initialize Redis connection pool"""
+        if cls._initialized:
+            logger.warning("Redis connection already initialized")
+            return
+        try:
+            logger.info("Initializing Redis connection")
+            pool = redis.ConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_max_connections,
+                socket_timeout=settings.redis_socket_timeout_seconds,
+                socket_connect_timeout=settings.redis_socket_connect_timeout_seconds,
+                health_check_interval=settings.redis_health_check_interval_seconds
+            )
+            cls._client = redis.Redis(connection_pool=pool)
+            await cls._client.ping()
+            logger.info("Redis connected successfully")
+            cls._initialized = True
+        except Exception as e:
+            logger.error(f"Redis connection failed: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Could not connect to Redis: {str(e)}")
+
+    @classmethod
+    def get_client(cls) -> redis.Redis:
+        """Get Redis client"""
+        if not cls._initialized or cls._client is None:
+            raise RuntimeError("Redis not initialized")
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        """Close Redis connection pool"""
+        if cls._client:
+            logger.info("Closing Redis connection")
+            await cls._client.aclose()
+            cls._client = None
+            cls._initialized = False
+
+    @classmethod
+    async def health_check(cls) -> bool:
+        """Check Redis health"""
+        try:
+            if cls._client is None:
+                return False
+            await cls._client.ping()
+            return True
+        except Exception:
+            return False
+
+def get_redis() -> redis.Redis:
+    return RedisConnection.get_client()
+
+
+## Shared with feedService's post hydration cache
+POST_KEY_PREFIX = "post:"
+POST_INVALIDATION_CHANNEL = "posts:invalidate"
+
+async def invalidate_post_cache(post_id: str) -> None:
+    """
+    Drop the post from feedService's hydration cache (Redis tier) and tell every
+    feed worker to evict it from its in-process tier
+    """
+    try:
+        client = get_redis()
+        await client.delete(f"{POST_KEY_PREFIX}{post_id}")
+        await client.publish(POST_INVALIDATION_CHANNEL, post_id)
+        logger.info(f"Post {post_id} invalidated from post cache")
+    except Exception as e:
+        ## A stale entry expires with the cache TTL
+        logger.warning(f"Failed to invalidate post cache for {post_id}: {str(e)}")
@@ -2,6 +2,7 @@ import logging
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from motor.core import AgnosticClient
+from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
 from app.config import settings
@@ -47,6 +48,17 @@ class MongoDBConnection:
             logger.error(f"Unexpected error connecting to MongoDB: {str(e)}", exc_info=True)
             raise
 
+    @classmethod
+    async def ensure_indexes(cls):
+        """Create the indexes the post read paths rely on"""
+        posts = cls.get_client()['db1']['posts']
+        ## Profile pages seek on user_id and walk (created_at, _id) newest first. Not a covering index:
+        ## the page projection includes post_url, caption and variants, so each of the page_size
+        ## matches is still fetched from the collection. Bounded by page_size, not by history length
+        await posts.create_index(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+
     @classmethod
     def get_client(cls) -> AsyncIOMotorClient:
         """Get MongoDB client"""
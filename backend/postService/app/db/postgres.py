@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     async_sessionmaker
 )
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 from sqlalchemy import text
 from sqlalchemy.orm import declarative_base
 
@@ -38,7 +38,7 @@ class PostgreSQLConnection:
             # Create async engine
             cls._engine = create_async_engine(
                 settings.postgres_url,
-                poolclass=QueuePool,
+                poolclass=AsyncAdaptedQueuePool, # QueuePool is rejected by async engines
                 pool_size=settings.postgres_pool_size,     
                 max_overflow=settings.postgres_max_overflow, 
                 pool_pre_ping=True,
@@ -2,6 +2,7 @@ import logging
 from typing import Optional
 from supabase import create_client, Client
 from concurrent.futures import ThreadPoolExecutor
+import httpx
 
 from app.config import settings
 
@@ -11,6 +12,7 @@ _storage_executor = ThreadPoolExecutor(max_workers=10)
 class SupabaseConnection:
     """Singleton Supabase client with optimized HTTP connection pooling"""
     _client: Optional[Client] = None
+    _storage_http: Optional[httpx.Client] = None
     _initialized: bool = False
 
     @classmethod
@@ -27,6 +29,16 @@ class SupabaseConnection:
                 settings.supabase_service_key,
             )
             
+            # Raw HTTP client against the storage API, used for streaming uploads
+            cls._storage_http = httpx.Client(
+                base_url=f"{settings.supabase_url}/storage/v1",
+                headers={
+                    "Authorization": f"Bearer {settings.supabase_service_key}",
+                    "apikey": settings.supabase_service_key,
+                },
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+
             # Test connection with a simple query
             cls._client.storage.list_buckets()
             logger.info("Supabase connected successfully")
@@ -42,6 +54,13 @@ class SupabaseConnection:
         if not cls._initialized or cls._client is None:
             raise RuntimeError("Supabase not initialized. Call initialize() first.")
         return cls._client
+
+    @classmethod
+    def get_storage_http(cls) -> httpx.Client:
+        """Get HTTP client for the storage API"""
+        if not cls._initialized or cls._storage_http is None:
+            raise RuntimeError("Supabase not initialized. Call initialize() first.")
+        return cls._storage_http
     
     @classmethod
     async def close(cls):
@@ -52,6 +71,9 @@ class SupabaseConnection:
                 await cls._client.auth.sign_out()
             except Exception as e:
                 logger.warning(f"Error during sign out: {e}")
+            if cls._storage_http is not None:
+                cls._storage_http.close()
+                cls._storage_http = None
             cls._client = None
             cls._initialized = False
     
@@ -6,7 +6,11 @@ import logging
 from app.db.mongo import MongoDBConnection
 from app.db.supabase import SupabaseConnection
 from app.db.postgres import PostgreSQLConnection
+from app.db.cache import RedisConnection
+from app.services.image_service import _image_executor
 from app.config import settings
+from app.core.token_cache import verified_token_cache
+from app.core.jwks import jwks_cache
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +22,10 @@ async def lifespan(app: FastAPI):
     try:
         await PostgreSQLConnection.initialize()
         await MongoDBConnection.initialize()
+        await MongoDBConnection.ensure_indexes()
+        await RedisConnection.initialize()
         SupabaseConnection.initialize()
+        await jwks_cache.start()
         logger.info("All connections initialized")
     except Exception as e:
         logger.error(f"Startup failed: {str(e)}", exc_info=True)
@@ -29,9 +36,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Application shutting down...")
     try:
+        await jwks_cache.stop()
         await PostgreSQLConnection.close()
         await MongoDBConnection.close()
-        SupabaseConnection.close()
+        await RedisConnection.close()
+        await SupabaseConnection.close()
+        _image_executor.shutdown(wait=False, cancel_futures=True)
         logger.info("All connections closed")
     except Exception as e:
         logger.error(f"Shutdown error: {str(e)}", exc_info=True)
@@ -72,7 +82,7 @@ async def health_check():
         return {"status": "unhealthy", "mongodb": "down"}, 503
     if not supabase_healthy:
         return {"status": "unhealthy", "supabase": "down"}, 503
-    return {"status": "healthy", "mongodb": "up", "supabase": "up"}
+    return {"status": "healthy", "mongodb": "up", "supabase": "up", "token_cache": verified_token_cache.stats()}
 
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, Date, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, Date, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQL_UUID
 from datetime import datetime
 import uuid
@@ -49,6 +49,13 @@ class Follow(Base):
     Follow relationship table matching Supabase schema.
     """
     __tablename__ = "follows"
+    __table_args__ = (
+        # One edge per pair, follow and unfollow upsert/delete against it
+        UniqueConstraint('follower_id', 'following_id', name='follows_follower_id_following_id_key'),
+        # Keyset pages of followers / following, newest first, are one backward index scan
+        Index('ix_follows_following_id_created_at_id', 'following_id', 'created_at', 'id'),
+        Index('ix_follows_follower_id_created_at_id', 'follower_id', 'created_at', 'id'),
+    )
     
     # Primary key - UUID
     id = Column(
@@ -73,11 +80,12 @@ class Follow(Base):
         index=True
     )
     
-    # Timestamp
+    # Timestamp, part of the keyset used to page follower lists so it can never be NULL
     created_at = Column(
         DateTime(timezone=True),
         default=datetime.utcnow,
-        nullable=True
+        server_default=func.now(),
+        nullable=False
     )
 
     def __repr__(self):
@@ -1,9 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Any, Dict
 from datetime import datetime
 
 class PostData(BaseModel):
-    image_data: bytes
+    image_file: Any  # file-like object, streamed to storage in chunks
     file_extension: str
     caption: Optional[str] = None
 
@@ -23,6 +23,11 @@ class PostFetchResponse(BaseModel):
     post_url: str
     caption: Optional[str] = None
     created_at: datetime
+    variants: Optional[Dict[str, Dict[str, str]]] = None  # {size: {format: url}}
+
+class PostPage(BaseModel):
+    posts: List[PostFetchResponse]
+    next_cursor: Optional[str] = None
 
 class PostDeleteResponse(BaseModel):
     message: str
\ No newline at end of file
@@ -0,0 +1,75 @@
+from app.db.mongo import MongoDBConnection
+from app.db.postgres import PostgreSQLConnection
+from app.db.supabase import SupabaseConnection
+from app.db.cache import RedisConnection
+from app.services.fanout_service import FanoutService
+from app.services.image_service import ImageService, _image_executor
+from app.services.storage_service import get_storage_service
+from app.config import settings
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+async def _wait(stop: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+async def drain(stop: asyncio.Event) -> None:
+    """
+    Claim and process fan-out jobs until stopped, polling when the outbox is empty.
+    A database error backs this consumer off (doubling up to fanout_max_backoff_seconds) instead of
+    ending it, a claimed job whose processing died is picked up again once its lease expires
+    """
+    session_factory = PostgreSQLConnection.get_session_factory()
+    image_service = ImageService(storage_service=get_storage_service())
+    failures = 0
+    while not stop.is_set():
+        try:
+            async with session_factory() as session:
+                fanout_service = FanoutService(session, render_variants=image_service.generate_variants)
+                job = await fanout_service.claim_job()
+                if job is not None:
+                    await fanout_service.process_job(job)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            backoff = min(settings.fanout_retry_backoff_seconds * (2 ** (failures - 1)), settings.fanout_max_backoff_seconds)
+            logger.error(f"Fan-out consumer failed, backing off {backoff}s: {str(e)}", exc_info=True)
+            await _wait(stop, backoff)
+            continue
+        if job is None:
+            await _wait(stop, settings.fanout_poll_interval_seconds)
+
+async def main(workers: int) -> None:
+    await PostgreSQLConnection.initialize()
+    await MongoDBConnection.initialize()
+    ## Variants jobs invalidate feedService's post cache once the post document changes
+    await RedisConnection.initialize()
+    SupabaseConnection.initialize()
+    try:
+        async with PostgreSQLConnection.get_session_factory()() as session:
+            await FanoutService(session).create_indexes()
+        stop = asyncio.Event()
+        logger.info(f"Fan-out worker started with {workers} consumers")
+        await asyncio.gather(*(drain(stop) for _ in range(workers)))
+    finally:
+        await PostgreSQLConnection.close()
+        MongoDBConnection.close()
+        await RedisConnection.close()
+        await SupabaseConnection.close()
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Drain the post fan-out outbox")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent consumers in this process")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.workers))
+    except KeyboardInterrupt:
+        logger.info("Fan-out worker stopped")
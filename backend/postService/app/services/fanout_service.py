@@ -0,0 +1,352 @@
+from app.db.mongo import get_mongo
+from app.config import settings
+
+from typing import List, Optional, Dict, AsyncIterator, Awaitable, Callable
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, ASCENDING
+from pymongo.errors import PyMongoError, BulkWriteError
+from pymongo.collection import Collection
+from bson import ObjectId
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+DUPLICATE_KEY_ERROR = 11000
+
+## Outbox job kinds. Fan-out jobs predate kinds and are keyed by the post's ObjectId
+FANOUT_JOB = "fanout"
+VARIANTS_JOB = "variants"
+
+
+class FanoutService:
+    """
+    Fan-out of new posts into followers' precomputed feeds.
+    upload_post enqueues a job into the fanout_outbox collection and returns, the
+    fan-out worker (app/script/fanout_worker.py) drains the outbox with retries.
+    The outbox also carries image variant jobs, run through the render_variants callable.
+    """
+## CONSTRUCTOR----------------------------------------------------------------------
+
+    def __init__(
+            self,
+            db_session: AsyncSession,
+            render_variants: Optional[Callable[[str], Awaitable[None]]] = None
+    ):
+        self._db_session = db_session
+        self._render_variants = render_variants
+
+        self._mongo: AsyncIOMotorClient = get_mongo()
+        self._mongo_db = self._mongo['db1']
+        self._precompute_feed_collection: Collection = self._mongo_db['precomputefeed']
+        self._pull_authors_collection: Collection = self._mongo_db['pull_authors']
+        self._outbox_collection: Collection = self._mongo_db['fanout_outbox']
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    async def _stream_followers(
+            self,
+            user_id: str
+    ) -> AsyncIterator[List[str]]:
+        """
+        Stream follower ids for a user from PostgreSQL in chunks of fanout_chunk_size,
+        using a server-side cursor so the full follower list is never materialized
+        """
+        try:
+            logger.debug(f"Streaming followers for user {user_id}")
+            from app.models.db_models import Follow
+            query = select(Follow.follower_id) \
+                .where(Follow.following_id == user_id) \
+                .execution_options(yield_per=settings.fanout_chunk_size)
+            result = await self._db_session.stream(query)
+            async for partition in result.partitions():
+                yield [str(row[0]) for row in partition]
+        except Exception as e:
+            logger.error(f"Failed to stream followers for {user_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Could not fetch followers: {str(e)}")
+
+    async def _count_followers(
+            self,
+            user_id: str
+    ) -> int:
+        try:
+            from app.models.db_models import Follow
+            query = select(func.count()).select_from(Follow).where(Follow.following_id == user_id)
+            result = await self._db_session.execute(query)
+            return result.scalar_one()
+        except Exception as e:
+            logger.error(f"Failed to count followers for {user_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Could not count followers: {str(e)}")
+
+    async def _mark_pull_author(
+            self,
+            user_id: str,
+            followers_count: int
+    ) -> None:
+        """
+        Register the author as pull-on-read. feedService merges posts of these authors
+        from the posts collection at read time instead of reading fanned-out feed rows.
+        """
+        try:
+            await self._pull_authors_collection.update_one(
+                {"_id": user_id},
+                {"$set": {"followers_count": followers_count, "updated_at": datetime.now()}},
+                upsert=True
+            )
+            logger.info(f"User {user_id} with {followers_count} followers served pull-on-read")
+        except PyMongoError as e:
+            logger.error(f"Failed to mark pull author {user_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Database error: {str(e)}")
+
+    async def _is_pull_author(
+            self,
+            user_id: str
+    ) -> bool:
+        try:
+            return await self._pull_authors_collection.find_one({"_id": user_id}, {"_id": 1}) is not None
+        except PyMongoError as e:
+            logger.error(f"Failed to read pull author {user_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Database error: {str(e)}")
+
+    async def _unmark_pull_author(
+            self,
+            user_id: str,
+            followers_count: int
+    ) -> None:
+        """
+        Return the author to fan-out on write. Posts made while pull-on-read are not in followers'
+        feed rows, the next full precompute brings them back
+        """
+        try:
+            await self._pull_authors_collection.delete_one({"_id": user_id})
+            logger.info(f"User {user_id} with {followers_count} followers fanned out on write again")
+        except PyMongoError as e:
+            logger.error(f"Failed to unmark pull author {user_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Database error: {str(e)}")
+
+    async def _insert_feed_chunk(
+            self,
+            documents: List[Dict]
+    ) -> int:
+        """
+        Unordered insert of one chunk of feed rows. Rows that already exist from an earlier
+        attempt hit the unique (user_id, post_id) index and are skipped, so retries are safe.
+        """
+        try:
+            result = await self._precompute_feed_collection.insert_many(
+                documents,
+                ordered=False
+            )
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            if any(error['code'] != DUPLICATE_KEY_ERROR for error in e.details.get('writeErrors', [])):
+                raise
+            return e.details.get('nInserted', 0)
+
+    async def _push_post_to_followers(
+            self,
+            post_id: str,
+            user_id: str,
+            created_at: datetime
+    ) -> None:
+            """
+            Push post to all followers' feeds in fixed-size chunks. At most fanout_inflight_chunks
+            inserts are outstanding at once, so memory stays flat regardless of follower count.
+            """
+            in_flight = set()
+            try:
+                post_object_id = ObjectId(post_id)
+                inserted, followers = 0, 0
+                async for chunk in self._stream_followers(user_id=user_id):
+                    documents = [
+                    {
+                        "user_id": follower_id,
+                        "post_id": post_object_id,
+                        "created_at": created_at
+                    }
+                    for follower_id in chunk
+                    ]
+                    followers += len(chunk)
+                    in_flight.add(asyncio.create_task(self._insert_feed_chunk(documents)))
+                    if len(in_flight) >= settings.fanout_inflight_chunks:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        inserted += sum(task.result() for task in done)
+                if in_flight:
+                    inserted += sum(await asyncio.gather(*in_flight))
+                if not followers:
+                    logger.info("No followers to push to")
+                    return
+                logger.info(f"Post {post_id} pushed to {inserted} of {followers} feeds successfully")
+            except PyMongoError as e:
+                logger.error(f"Failed to push to feeds: {str(e)}", exc_info=True)
+                raise RuntimeError(f"Feed push failed: {str(e)}")
+            finally:
+                for task in in_flight:
+                    task.cancel()
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def fan_out(
+            self,
+            post_id: str,
+            user_id: str,
+            created_at: datetime
+    ) -> None:
+        """
+        Fan out one post. High-follower authors are not fanned out on write,
+        followers pull their posts on read. An author only goes back to fan-out once
+        below the threshold minus fanout_pull_hysteresis, so a count hovering at the
+        threshold does not flip the author on every post
+        """
+        followers_count = await self._count_followers(
+            user_id=user_id
+        )
+        if followers_count > settings.fanout_follower_threshold:
+            await self._mark_pull_author(
+                user_id=user_id,
+                followers_count=followers_count
+            )
+            return
+        if await self._is_pull_author(user_id=user_id):
+            if followers_count > settings.fanout_follower_threshold - settings.fanout_pull_hysteresis:
+                await self._mark_pull_author(
+                    user_id=user_id,
+                    followers_count=followers_count
+                )
+                return
+            await self._unmark_pull_author(
+                user_id=user_id,
+                followers_count=followers_count
+            )
+        await self._push_post_to_followers(
+            post_id=post_id,
+            user_id=user_id,
+            created_at=created_at
+        )
+
+    async def enqueue(
+            self,
+            post_id: str,
+            user_id: str,
+            created_at: datetime
+    ) -> None:
+        """
+        Add a fan-out job to the outbox. The post id is the job id, so enqueuing twice is a no-op
+        """
+        try:
+            now = datetime.now()
+            await self._outbox_collection.update_one(
+                {"_id": ObjectId(post_id)},
+                {"$setOnInsert": {
+                    "user_id": user_id,
+                    "created_at": created_at,
+                    "status": "pending",
+                    "attempts": 0,
+                    "available_at": now,
+                    "enqueued_at": now
+                }},
+                upsert=True
+            )
+            logger.info(f"Fan-out job enqueued for post {post_id}")
+        except PyMongoError as e:
+            logger.error(f"Failed to enqueue fan-out for {post_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Fan-out enqueue failed: {str(e)}")
+
+    async def enqueue_variants(
+            self,
+            post_id: str
+    ) -> None:
+        """Add an image variants job to the outbox, enqueuing twice is a no-op"""
+        try:
+            now = datetime.now()
+            await self._outbox_collection.update_one(
+                {"_id": f"{VARIANTS_JOB}:{post_id}"},
+                {"$setOnInsert": {
+                    "kind": VARIANTS_JOB,
+                    "post_id": post_id,
+                    "status": "pending",
+                    "attempts": 0,
+                    "available_at": now,
+                    "enqueued_at": now
+                }},
+                upsert=True
+            )
+            logger.info(f"Variants job enqueued for post {post_id}")
+        except PyMongoError as e:
+            logger.error(f"Failed to enqueue variants for {post_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Variants enqueue failed: {str(e)}")
+
+    async def cancel(
+            self,
+            post_id: str
+    ) -> None:
+        """Drop the post's pending jobs, used when the post is deleted before they ran"""
+        try:
+            await self._outbox_collection.delete_many({"_id": {"$in": [ObjectId(post_id), f"{VARIANTS_JOB}:{post_id}"]}})
+        except PyMongoError as e:
+            logger.error(f"Failed to cancel fan-out for {post_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Fan-out cancel failed: {str(e)}")
+
+    async def claim_job(self) -> Optional[Dict]:
+        """
+        Lease the oldest available job. A job whose worker died becomes available again
+        once its lease runs out
+        """
+        now = datetime.now()
+        return await self._outbox_collection.find_one_and_update(
+            {"status": {"$in": ["pending", "processing"]}, "available_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "processing",
+                    "available_at": now + timedelta(seconds=settings.fanout_lease_seconds)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def process_job(
+            self,
+            job: Dict
+    ) -> bool:
+        """Run one claimed job. Returns True when the job is done and removed from the outbox"""
+        kind = job.get('kind', FANOUT_JOB)
+        post_id = job.get('post_id') or str(job['_id'])
+        try:
+            if kind == VARIANTS_JOB:
+                if self._render_variants is None:
+                    raise RuntimeError("No variants renderer configured")
+                await self._render_variants(post_id)
+            else:
+                await self.fan_out(
+                    post_id=post_id,
+                    user_id=job['user_id'],
+                    created_at=job['created_at']
+                )
+            await self._outbox_collection.delete_one({"_id": job['_id']})
+            logger.info(f"{kind.capitalize()} job for post {post_id} completed")
+            return True
+        except Exception as e:
+            if job['attempts'] >= settings.fanout_max_attempts:
+                logger.error(f"{kind.capitalize()} job for post {post_id} failed permanently: {str(e)}", exc_info=True)
+                update = {"status": "failed", "error": str(e)}
+            else:
+                backoff = settings.fanout_retry_backoff_seconds * (2 ** (job['attempts'] - 1))
+                logger.warning(f"{kind.capitalize()} job for post {post_id} failed, retrying in {backoff}s: {str(e)}")
+                update = {
+                    "status": "pending",
+                    "error": str(e),
+                    "available_at": datetime.now() + timedelta(seconds=backoff)
+                }
+            await self._outbox_collection.update_one({"_id": job['_id']}, {"$set": update})
+            return False
+
+    async def create_indexes(self) -> None:
+        await self._outbox_collection.create_index(
+            [("status", ASCENDING), ("available_at", ASCENDING)]
+        )
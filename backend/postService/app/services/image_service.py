@@ -0,0 +1,157 @@
+from app.db.mongo import get_mongo
+from app.db.cache import invalidate_post_cache
+from app.services.storage_service import StorageService, get_storage_service
+from app.config import settings
+
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from pymongo.errors import PyMongoError
+from pymongo.collection import Collection
+from bson import ObjectId
+from fastapi import Depends
+from io import BytesIO
+import asyncio
+import logging
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+## Resizing and encoding is CPU bound, keep it off the event loop and out of the GIL.
+## Spawned rather than forked, the parent holds live Motor and asyncpg connections
+_image_executor = ProcessPoolExecutor(
+    max_workers=settings.image_workers,
+    mp_context=multiprocessing.get_context("spawn")
+)
+
+PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def render_variants(image_data: bytes, sizes: List[int], formats: List[str]) -> Dict[str, Dict[str, bytes]]:
+    """
+    Resize the image so its longest side fits each size and encode it in each format.
+    Runs in a worker process, so it must stay a module level function.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(image_data)) as original:
+        original = ImageOps.exif_transpose(original).convert("RGB")
+        variants = {}
+        for size in sizes:
+            resized = original.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            variants[str(size)] = {}
+            for image_format in formats:
+                buffer = BytesIO()
+                if image_format == "jpeg":
+                    resized.save(buffer, PIL_FORMATS[image_format], quality=85, optimize=True, progressive=True)
+                else:
+                    resized.save(buffer, PIL_FORMATS[image_format], quality=80, method=4)
+                variants[str(size)][image_format] = buffer.getvalue()
+        return variants
+
+
+class ImageService:
+## CONSTRUCTOR----------------------------------------------------------------------
+
+    def __init__(
+            self,
+            storage_service: StorageService
+    ):
+        self._mongo = get_mongo()
+        self._posts_collection: Collection = self._mongo['db1']['posts']
+        self._storage_service = storage_service
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    @staticmethod
+    def _storage_path(post_url: str) -> str:
+        file_path_parts = post_url.split('/')
+        file_name = file_path_parts[-1].split('?')[0]
+        user_id = file_path_parts[-2]
+        return f"{user_id}/{file_name}"
+
+    async def _remove_files(
+            self,
+            file_paths: List[str]
+    ) -> None:
+        for file_path in file_paths:
+            try:
+                await self._storage_service.delete_from_storage(file_path=file_path)
+            except Exception as e:
+                logger.warning(f"Failed to remove variant {file_path}: {str(e)}")
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def generate_variants(
+            self,
+            post_id: str
+    ) -> None:
+        """
+        Build resized variants of a post image and record their URLs on the post document.
+        Run by the fan-out worker from a variants outbox job, failures raise so the job is retried.
+        Variant paths are deterministic and uploaded with upsert, so a retry overwrites a partial run.
+        If the post is deleted while rendering, the uploaded variants are removed again.
+        """
+        try:
+            post = await self._posts_collection.find_one({"_id": ObjectId(post_id)}, {"post_url": 1})
+            if post is None:
+                logger.info(f"Post {post_id} deleted before variants were generated")
+                return
+            original_path = self._storage_path(post['post_url'])
+            image_data = await self._storage_service.download_from_storage(file_path=original_path)
+            loop = asyncio.get_running_loop()
+            rendered = await loop.run_in_executor(
+                _image_executor,
+                render_variants,
+                image_data,
+                settings.image_variant_sizes,
+                settings.image_variant_formats
+            )
+            del image_data
+            if await self._posts_collection.count_documents({"_id": ObjectId(post_id)}, limit=1) == 0:
+                logger.info(f"Post {post_id} deleted while variants were rendered")
+                return
+            stem = original_path.rsplit('.', 1)[0]
+            variants = {}
+            uploaded = []
+            try:
+                for size, encoded in rendered.items():
+                    variants[size] = {}
+                    for image_format, data in encoded.items():
+                        file_path = f"{stem}_{size}.{image_format}"
+                        variants[size][image_format] = await self._storage_service.upload_stream_to_storage(
+                            file_obj=BytesIO(data),
+                            file_path=file_path,
+                            file_extension=image_format,
+                            upsert=True
+                        )
+                        uploaded.append(file_path)
+                result = await self._posts_collection.update_one(
+                    {"_id": ObjectId(post_id)},
+                    {"$set": {"variants": variants}}
+                )
+            except Exception:
+                await self._remove_files(uploaded)
+                raise
+            if not result.matched_count:
+                ## Deleted between the check and the write, delete_post never saw these files
+                logger.info(f"Post {post_id} deleted while variants were uploaded, removing them")
+                await self._remove_files(uploaded)
+                return
+            await invalidate_post_cache(post_id)
+            logger.info(f"Generated {len(variants)} variant sizes for post {post_id}")
+        except PyMongoError as e:
+            logger.error(f"MongoDB error storing variants for {post_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Database error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to generate variants for {post_id}: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Variant generation failed: {str(e)}")
+
+
+# Factory pattern function
+def get_image_service(
+    storage_service: StorageService = Depends(get_storage_service)
+) -> ImageService:
+    """Create new instance per request"""
+    return ImageService(storage_service=storage_service)
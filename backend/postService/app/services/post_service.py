@@ -1,10 +1,14 @@
 from app.db.mongo import get_mongo
 from app.db.postgres import get_db_session
-from app.models.post import Post, PostData, PostUploadResponse, PostFetchResponse, PostDeleteResponse
+from app.db.cache import invalidate_post_cache
+from app.models.post import Post, PostData, PostUploadResponse, PostFetchResponse, PostPage, PostDeleteResponse
 from app.services.storage_service import StorageService, get_storage_service
+from app.services.fanout_service import FanoutService
+from app.core.pagination import encode_cursor, decode_cursor
+from app.config import settings
 
 import uuid
-from typing import List
+from typing import List, Dict, Optional, BinaryIO
 from supabase import Client
 from motor.motor_asyncio import AsyncIOMotorClient
 from motor.core import AgnosticCollection
@@ -22,7 +26,6 @@ from fastapi import Depends
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-
 class PostService:
 ## CONSTRUCTOR----------------------------------------------------------------------
 
@@ -39,6 +42,7 @@ class PostService:
         self._precompute_feed_collection: Collection = self._mongo_db['precomputefeed']
 
         self._storage_service = storage_service
+        self._fanout_service = FanoutService(db_session)
 
         self._saga_state = {
             'blob_url': None,
@@ -48,41 +52,23 @@ class PostService:
     
 ## HELPER FUNCTIONS-----------------------------------------------------------------
     
-    async def _get_followers(
-            self,
-            user_id: str
-    ) -> List[str]:
-        """
-        Get all followers for a user from Supabase.
-        Supabase is still synchronous, so we use thread pool.
-        """
-        try:
-            logger.debug(f"Fetching followers for user {user_id}")
-            from app.models.db_models import Follow
-            query = select(Follow.follower_id).where(Follow.following_id == user_id)
-            result = await self._db_session.execute(query)
-            followers = [row[0] for row in result.fetchall()]
-            logger.info(f"Found {len(followers)} followers for user {user_id}")
-            return followers
-        except Exception as e:
-            logger.error(f"Failed to get followers for {user_id}: {str(e)}", exc_info=True)
-            raise RuntimeError(f"Could not fetch followers: {str(e)}")
-    
     async def _upload_post_to_storage(
             self,
-            file_data: bytes, 
+            file_obj: BinaryIO, 
             user_id: str, 
             file_extension: str
     ) -> str:
         try:
             file_name = f"{uuid.uuid4().hex}.{file_extension}"
             file_path = f"{user_id}/{file_name}"
-            blob_url = self._storage_service.upload_to_storage(
-                file_data=file_data,
+            blob_url = await self._storage_service.upload_stream_to_storage(
+                file_obj=file_obj,
                 file_path=file_path,
                 file_extension=file_extension
             )
             return blob_url
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Failed to upload to storage: {str(e)}", exc_info=True)
             raise RuntimeError(f"Storage upload failed: {str(e)}")
@@ -113,55 +99,24 @@ class PostService:
             logger.error(f"MongoDB error creating post: {str(e)}", exc_info=True)
             raise RuntimeError(f"Database error: {str(e)}")
 
-    async def _push_post_to_followers(
-            self,
-            post_id: str,
-            created_at: datetime,
-            followers: List[str]
-    ) -> None:
-            """
-            Push post to all followers' feeds.
-            """
-            try:
-                if not followers:
-                    logger.info("No followers to push to")
-                    return
-                logger.info(f"Pushing post {post_id} to {len(followers)} followers")
-                documents = [
-                {
-                    "user_id": follower_id,
-                    "post_id": ObjectId(post_id),
-                    "created_at": created_at
-                }
-                for follower_id in followers
-                ]
-                result = await self._precompute_feed_collection.insert_many(
-                documents,
-                ordered=False
-                )
-                logger.info(f"Post {post_id} pushed to {len(result.inserted_ids)} feeds successfully")
-            except PyMongoError as e:
-                logger.error(f"Failed to push to feeds: {str(e)}", exc_info=True)
-                raise RuntimeError(f"Feed push failed: {str(e)}")
-    
     async def _delete_post_metadata(
             self,
             post_id: str,
             user_id: str
-    ) -> str:
+    ) -> Dict:
         """
-        Delete post metadata from MongoDB
+        Delete post metadata from MongoDB, returns the deleted document
         """
         try:
             logger.info(f"Deleting post metadata {post_id} for user {user_id}")
-            result = await self._posts_collection.delete_one({
+            post = await self._posts_collection.find_one_and_delete({
                 "_id": ObjectId(post_id),
                 "user_id": user_id
             })
-            if result.deleted_count == 0:
+            if post is None:
                 raise ValueError(f"Post {post_id} not found or unauthorized")
             logger.info(f"Post metadata {post_id} deleted successfully")
-            return result['post_url']
+            return post
         except ValueError:
             raise
         except PyMongoError as e:
@@ -205,7 +160,6 @@ class PostService:
         except PyMongoError as e:
             logger.error(f"Failed to remove post from feeds: {str(e)}", exc_info=True)
             raise RuntimeError(f"Feed removal failed: {str(e)}")
-        
 
 ## COMPENSATION FUNCTIONS-------------------------------------------------------------
 
@@ -224,7 +178,7 @@ class PostService:
             logger.info(f"Starting post upload for user {user_id}")
             # STEP 1: Upload to storage
             blob_url = await self._upload_post_to_storage(
-                file_data=postData.image_data,
+                file_obj=postData.image_file,
                 user_id=user_id,
                 file_extension=postData.file_extension
             )
@@ -235,46 +189,75 @@ class PostService:
                 caption=postData.caption,
                 created_at=created_at
             )
-            ## STEP 3: Get followers of the current user
-            followers = await self._get_followers(
-                user_id=user_id
-            )
-            ## STEP 4: Push post to followers' feed
-            await self._push_post_to_followers(
-                post_id=post_id,
-                created_at=created_at,
-                followers=followers
+            ## STEP 3: Queue thumbnail rendering on the durable outbox
+            await self._fanout_service.enqueue_variants(
+                post_id=post_id
             )
-            logger.info("New post pushed to feed table for followers successfully")
+            ## STEP 4: Fan out to followers' feeds, off the request path unless configured inline
+            if settings.fanout_async:
+                await self._fanout_service.enqueue(
+                    post_id=post_id,
+                    user_id=user_id,
+                    created_at=created_at
+                )
+            else:
+                await self._fanout_service.fan_out(
+                    post_id=post_id,
+                    user_id=user_id,
+                    created_at=created_at
+                )
             return PostUploadResponse(
                 post_id=post_id,
                 message="Post Created Successfully"
             )
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Post upload failed, initiating rollback: {str(e)}", exc_info=True)
             raise RuntimeError(f"Failed to upload post: {str(e)}")
     
     async def get_post(
             self, 
-            user_id: str
-    ) -> List[PostFetchResponse]:
+            user_id: str,
+            cursor: Optional[str] = None,
+            page_size: Optional[int] = None
+    ) -> PostPage:
+        """
+        Keyset-paginated profile posts, newest first. The cursor encodes (created_at, _id) of the
+        last post of the previous page, so each page is one seek on the (user_id, created_at, _id) index.
+        """
         try:
             logger.info(f"Fetching posts for user {user_id}")
-            cursor = self._posts_collection.find({"user_id": user_id}) \
-                .sort("created_at", -1)
-            documents = await cursor.to_list()
+            page_size = min(page_size or settings.posts_page_size, settings.posts_max_page_size)
+            query = {"user_id": user_id}
+            position = decode_cursor(cursor)
+            if position:
+                last_created_at, last_post_id = position
+                query["$or"] = [
+                    {"created_at": {"$lt": last_created_at}},
+                    {"created_at": last_created_at, "_id": {"$lt": last_post_id}}
+                ]
+            documents = await self._posts_collection \
+                .find(query, {"user_id": 1, "post_url": 1, "caption": 1, "created_at": 1, "variants": 1}) \
+                .sort([("created_at", -1), ("_id", -1)]) \
+                .limit(page_size) \
+                .to_list(length=page_size)
             posts = [
                 PostFetchResponse(
                     post_id=str(doc['_id']),
                     user_id=doc['user_id'],
                     post_url=doc['post_url'],
-                    caption=doc['caption'],
-                    created_at=doc['created_at']
+                    caption=doc.get('caption'),
+                    created_at=doc['created_at'],
+                    variants=doc.get('variants')
                 )
                 for doc in documents
             ]
+            next_cursor = None
+            if len(documents) == page_size:
+                next_cursor = encode_cursor(documents[-1]['created_at'], str(documents[-1]['_id']))
             logger.info(f"Retrieved {len(posts)} posts for user {user_id}")
-            return posts
+            return PostPage(posts=posts, next_cursor=next_cursor)
         except PyMongoError as e:
             logger.error(f"Database error fetching posts: {str(e)}", exc_info=True)
             raise RuntimeError(f"Failed to fetch posts: {str(e)}")
@@ -290,18 +273,28 @@ class PostService:
         try:
             logger.info(f"Deleting post {post_id} for user {user_id}")
             # STEP 1: Remove from posts collection
-            post_url = await self._delete_post_metadata(
+            post = await self._delete_post_metadata(
                 post_id=post_id,
                 user_id=user_id
             )
-            # STEP 2: Delete from storage
+            # STEP 2: Delete original and resized variants from storage
             await self._delete_post_from_storage(
-                post_url=post_url
+                post_url=post['post_url']
+            )
+            for formats in post.get('variants', {}).values():
+                for variant_url in formats.values():
+                    await self._delete_post_from_storage(
+                        post_url=variant_url
+                    )
+            # STEP 3: Remove from feeds table, cancelling the fan-out first if it has not run yet
+            await self._fanout_service.cancel(
+                post_id=post_id
             )
-            # STEP 3: Remove from feeds table
             await self._remove_post_from_feeds(
                 post_id=post_id
             )
+            # STEP 4: Invalidate the feed hydration cache
+            await invalidate_post_cache(post_id)
             logger.info(f"Post {post_id} deleted successfully")
             return PostDeleteResponse(
                 message="Post Deleted Successfully"
@@ -321,4 +314,4 @@ def get_post_service(
     storage_service: StorageService = Depends(get_storage_service)
 ) -> PostService:
     """Create new instance per request"""
-    return PostService(db_session, storage_service)
\ No newline at end of file
+    return PostService(storage_service=storage_service, db_session=db_session)
\ No newline at end of file
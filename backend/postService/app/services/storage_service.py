@@ -1,9 +1,12 @@
 import logging
-from typing import Optional
+from typing import Optional, BinaryIO
 from supabase import Client
 import asyncio
+import httpx
 
-from app.db.supabase import get_supabase, _storage_executor
+from app.db.supabase import get_supabase, SupabaseConnection, _storage_executor
+from app.config import settings
+from app.core.uploads import read_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,7 @@ class StorageService:
 
     def __init__(self):
         self._supabase: Client = get_supabase()
+        self._storage_http: httpx.Client = SupabaseConnection.get_storage_http()
         self.bucket_name = "user_images"
 
 ## MAIN FUNCTIONS-------------------------------------------------------------------
@@ -43,6 +47,53 @@ class StorageService:
             logger.error(f"Failed to upload file: {str(e)}", exc_info=True)
             raise RuntimeError(f"Storage upload failed: {str(e)}")
     
+    async def upload_stream_to_storage(
+            self,
+            file_obj: BinaryIO,
+            file_path: str,
+            file_extension: str,
+            upsert: bool = False
+    ) -> str:
+        """
+        Stream a file-like object to Supabase storage chunk by chunk, so the image is never held in memory as bytes.
+        The size limit is enforced while streaming. Runs on the storage executor as the HTTP client is sync
+        """
+        try:
+            logger.info(f"Streaming file to storage: {file_path}")
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _storage_executor,
+                lambda: self._storage_http.post(
+                    f"/object/{self.bucket_name}/{file_path}",
+                    content=read_chunks(file_obj),
+                    headers={"content-type": f"image/{file_extension}", "x-upsert": "true" if upsert else "false"}
+                )
+            )
+            response.raise_for_status()
+            blob_url = self._supabase.storage.from_(self.bucket_name).get_public_url(file_path)
+            logger.info(f"File uploaded successfully: {blob_url}")
+            return blob_url
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to upload file: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Storage upload failed: {str(e)}")
+
+    async def download_from_storage(self, file_path: str) -> bytes:
+        """Handle download image from Supabase storage on the storage executor, the client is sync and blocking"""
+        try:
+            logger.info(f"Downloading file from storage: {file_path}")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _storage_executor,
+                lambda: self._supabase.storage
+                    .from_(self.bucket_name)
+                    .download(file_path)
+            )
+        except Exception as e:
+            logger.error(f"Failed to download file: {str(e)}", exc_info=True)
+            raise RuntimeError(f"Storage download failed: {str(e)}")
+
     async def delete_from_storage(self, file_path: str) -> bool:
         """Handle delete image from Supabase storage. Supabase client is sync and blocking operation, so handoff the delete of the image to a separate thread and keep the event loop free to execute other coroutines"""
         try:
@@ -0,0 +1,80 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+import asyncio
+
+from app.db.mongo import MongoDBConnection
+from app.services.post_service import PostService
+
+@pytest.fixture
+def posts(monkeypatch):
+    monkeypatch.setattr(MongoDBConnection, "_client", AsyncMongoMockClient())
+    monkeypatch.setattr(MongoDBConnection, "_initialized", True)
+    return MongoDBConnection._client['db1']['posts']
+
+def _post(user_id: str, created_at: datetime) -> dict:
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "post_url": f"https://storage.example/user_images/{user_id}/photo.jpg",
+        "caption": "hello",
+        "created_at": created_at
+    }
+
+def _walk(service: PostService, user_id: str, page_size: int) -> list:
+    """Every page of a profile, following next_cursor until it runs out"""
+    async def run():
+        pages, cursor = [], None
+        while True:
+            page = await service.get_post(user_id, cursor=cursor, page_size=page_size)
+            pages.append([post.post_id for post in page.posts])
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+    return asyncio.run(run())
+
+def test_pages_are_newest_first_without_repeats_or_gaps(posts):
+    """Posts sharing a created_at are split across pages by _id, none is repeated or skipped"""
+    now = datetime(2024, 5, 17, 12, 0, 0)
+    docs = [_post("user-1", now - timedelta(minutes=minutes)) for minutes in (0, 1, 1, 1, 2)]
+    docs.append(_post("user-2", now))
+    asyncio.run(posts.insert_many(docs))
+
+    pages = _walk(PostService(storage_service=None, db_session=None), "user-1", page_size=2)
+
+    expected = [
+        str(doc['_id'])
+        for doc in sorted(docs[:5], key=lambda doc: (doc['created_at'], doc['_id']), reverse=True)
+    ]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [post_id for page in pages for post_id in page] == expected
+
+def test_full_last_page_is_followed_by_an_empty_one(posts):
+    """A page is only known to be the last when it comes back short"""
+    now = datetime(2024, 5, 17, 12, 0, 0)
+    asyncio.run(posts.insert_many([_post("user-1", now - timedelta(minutes=minutes)) for minutes in range(4)]))
+
+    pages = _walk(PostService(storage_service=None, db_session=None), "user-1", page_size=2)
+
+    assert [len(page) for page in pages] == [2, 2, 0]
+
+def test_page_size_is_capped(posts, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "posts_max_page_size", 3)
+    now = datetime(2024, 5, 17, 12, 0, 0)
+    asyncio.run(posts.insert_many([_post("user-1", now - timedelta(minutes=minutes)) for minutes in range(5)]))
+
+    page = asyncio.run(PostService(storage_service=None, db_session=None).get_post("user-1", page_size=100))
+
+    assert len(page.posts) == 3
+    assert page.next_cursor is not None
+
+def test_malformed_cursor_raises_value_error(posts):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(PostService(storage_service=None, db_session=None).get_post("user-1", cursor="not-a-cursor!"))
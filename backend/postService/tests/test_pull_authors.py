@@ -0,0 +1,66 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+import asyncio
+
+from app.config import settings
+from app.db.mongo import MongoDBConnection
+from app.services.fanout_service import FanoutService
+
+@pytest.fixture
+def fanout(monkeypatch):
+    """FanoutService with a settable follower count and a record of the posts pushed on write"""
+    monkeypatch.setattr(MongoDBConnection, "_client", AsyncMongoMockClient())
+    monkeypatch.setattr(MongoDBConnection, "_initialized", True)
+    monkeypatch.setattr(settings, "fanout_follower_threshold", 100)
+    monkeypatch.setattr(settings, "fanout_pull_hysteresis", 10)
+    service = FanoutService(None)
+    service.followers_count = 0
+    service.pushed = []
+
+    async def count_followers(user_id):
+        return service.followers_count
+
+    async def push_post_to_followers(post_id, user_id, created_at):
+        service.pushed.append(post_id)
+
+    service._count_followers = count_followers
+    service._push_post_to_followers = push_post_to_followers
+    return service
+
+def _post_at(service: FanoutService, followers_count: int) -> str:
+    service.followers_count = followers_count
+    post_id = str(ObjectId())
+    asyncio.run(service.fan_out(post_id=post_id, user_id="author", created_at=datetime.now()))
+    return post_id
+
+def _is_pull_author(service: FanoutService) -> bool:
+    return asyncio.run(service._is_pull_author("author"))
+
+def test_author_above_threshold_is_pulled(fanout):
+    _post_at(fanout, 101)
+    assert _is_pull_author(fanout)
+    assert fanout.pushed == []
+
+def test_pull_author_stays_pulled_inside_the_hysteresis_band(fanout):
+    _post_at(fanout, 101)
+    _post_at(fanout, 95)
+    assert _is_pull_author(fanout)
+    assert fanout.pushed == []
+
+def test_pull_author_below_the_band_is_fanned_out_again(fanout):
+    _post_at(fanout, 101)
+    post_id = _post_at(fanout, 90)
+    assert not _is_pull_author(fanout)
+    assert fanout.pushed == [post_id]
+
+def test_author_never_pulled_is_fanned_out_inside_the_band(fanout):
+    post_id = _post_at(fanout, 95)
+    assert not _is_pull_author(fanout)
+    assert fanout.pushed == [post_id]
@@ -0,0 +1,98 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from bson import ObjectId
+from fakeredis import aioredis as fake_aioredis
+from mongomock_motor import AsyncMongoMockClient
+from PIL import Image
+import asyncio
+
+from app.db.cache import RedisConnection, POST_KEY_PREFIX
+from app.db.mongo import MongoDBConnection
+from app.services import image_service
+from app.services.fanout_service import FanoutService, VARIANTS_JOB
+from app.services.image_service import ImageService
+
+class FakeStorage():
+    """In-memory stand-in for the Supabase storage bucket"""
+    def __init__(self, files):
+        self.files = dict(files)
+
+    async def download_from_storage(self, file_path):
+        return self.files[file_path]
+
+    async def upload_stream_to_storage(self, file_obj, file_path, file_extension, upsert=False):
+        self.files[file_path] = file_obj.read()
+        return f"https://storage.example/user_images/{file_path}"
+
+    async def delete_from_storage(self, file_path):
+        self.files.pop(file_path, None)
+        return True
+
+def _jpeg() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Redis and Mongo set up the way the fan-out worker's main() initializes them"""
+    monkeypatch.setattr(RedisConnection, "_client", fake_aioredis.FakeRedis())
+    monkeypatch.setattr(RedisConnection, "_initialized", True)
+    monkeypatch.setattr(MongoDBConnection, "_client", AsyncMongoMockClient())
+    monkeypatch.setattr(MongoDBConnection, "_initialized", True)
+    ## Render in a thread, spawning worker processes is not needed to exercise the job
+    monkeypatch.setattr(image_service, "_image_executor", ThreadPoolExecutor(max_workers=1))
+    yield RedisConnection._client, MongoDBConnection._client['db1']
+
+def test_variants_job_invalidates_post_cache(connections):
+    redis, mongo_db = connections
+
+    async def run():
+        post_id = ObjectId()
+        await mongo_db['posts'].insert_one({
+            "_id": post_id,
+            "user_id": "user-1",
+            "post_url": "https://storage.example/user_images/user-1/photo.jpg",
+            "caption": "hello",
+            "created_at": datetime.now()
+        })
+        ## feedService cached the post before its variants existed
+        await redis.hset(f"{POST_KEY_PREFIX}{post_id}", mapping={"post_url": "cached"})
+
+        storage = FakeStorage({"user-1/photo.jpg": _jpeg()})
+        fanout_service = FanoutService(None, render_variants=ImageService(storage_service=storage).generate_variants)
+        await fanout_service.enqueue_variants(str(post_id))
+        job = await mongo_db['fanout_outbox'].find_one({"_id": f"{VARIANTS_JOB}:{post_id}"})
+        job['attempts'] = 1
+
+        assert await fanout_service.process_job(job)
+        post = await mongo_db['posts'].find_one({"_id": post_id})
+        return post_id, post, storage
+
+    post_id, post, storage = asyncio.run(run())
+    assert post['variants']
+    assert any(path.startswith("user-1/photo_") for path in storage.files)
+    assert asyncio.run(redis.exists(f"{POST_KEY_PREFIX}{post_id}")) == 0
+
+def test_variants_job_for_a_deleted_post_uploads_nothing(connections):
+    redis, mongo_db = connections
+
+    async def run():
+        post_id = ObjectId()
+        storage = FakeStorage({"user-1/photo.jpg": _jpeg()})
+        fanout_service = FanoutService(None, render_variants=ImageService(storage_service=storage).generate_variants)
+        await fanout_service.enqueue_variants(str(post_id))
+        job = await mongo_db['fanout_outbox'].find_one({"_id": f"{VARIANTS_JOB}:{post_id}"})
+        job['attempts'] = 1
+        assert await fanout_service.process_job(job)
+        return storage
+
+    storage = asyncio.run(run())
+    assert list(storage.files) == ["user-1/photo.jpg"]
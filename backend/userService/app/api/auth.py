@@ -3,6 +3,7 @@ from app.db.database import get_db
 from app.models.user import User, UserRegister, UserLogin
 from app.models.token import Token, RefreshToken, LogoutMessage
 from app.services.auth_service import auth_obj as auth_service
+from app.core.security import PasswordHashingBusy
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -11,9 +12,11 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 async def register(user_data: UserRegister):
     """Register a new user"""
     try:
-        return auth_service.register_user(user_data)
+        return await auth_service.register_user(user_data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail="Registration failed")
 
@@ -21,7 +24,10 @@ async def register(user_data: UserRegister):
 @router.post("/login", response_model=User)
 async def login(login_data: UserLogin):
     """Login user"""
-    result = auth_service.login_user(login_data)
+    try:
+        result = await auth_service.login_user(login_data)
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     
     if not result:
         raise HTTPException(
@@ -36,7 +42,10 @@ async def logout(request: RefreshToken):
     """
     Logout user by revoking refresh token
     """
-    result = auth_service.logout_user(request)
+    try:
+        result = await auth_service.logout_user(request)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
 
     if not result:
         raise HTTPException(
@@ -50,7 +59,7 @@ async def logout(request: RefreshToken):
 async def refresh_token(request: RefreshToken):
     """Create new access token by sending the refresh token"""
     try:
-        return auth_service.refresh_token(request)
+        return await auth_service.refresh_token(request)
     except ValueError as e:
         # All ValueErrors become 401 Unauthorized
         raise HTTPException(status_code=401, detail=str(e))
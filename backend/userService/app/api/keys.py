@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+from app.core.keys import key_store
+from typing import Dict
+
+router = APIRouter(tags=["Keys"])
+
+## /.well-known/jwks.json
+@router.get("/.well-known/jwks.json")
+async def get_jwks(response: Response) -> Dict:
+    """
+    Public keys for verifying tokens issued by this service (current, next and not yet expired ones)
+    Other services cache this document and refresh it in the background
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return key_store.jwks()
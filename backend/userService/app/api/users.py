@@ -1,10 +1,12 @@
 # app/api/users.py (new file)
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from app.models.user import User, Image, Message
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from app.models.user import User, UserBatchRequest, Image, Message
 from app.core.dependencies import get_current_user
+from app.core.uploads import UploadTooLarge
 from app.db.database import get_db
 from app.services.user_service import user_obj
-from typing import Dict
+from app.config import settings
+from typing import Dict, List
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,7 +16,18 @@ async def get_my_profile(current_user: Dict = Depends(get_current_user)):
     Get current user's profile
     This endpoint is PROTECTED - requires valid JWT token
     """
-    return user_obj.get_user(current_user['user_id'])
+    return await user_obj.get_user(current_user['user_id'])
+
+@router.post("/batch", response_model=List[User])
+async def get_profiles(
+    request: UserBatchRequest,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Get profiles for many users at once (feeds, follower lists)
+    PROTECTED - requires valid JWT token
+    """
+    return await user_obj.get_users(request.user_ids)
 
 @router.put("/me", response_model=User)
 async def update_my_profile(
@@ -25,7 +38,7 @@ async def update_my_profile(
     Update current user's profile
     PROTECTED - requires valid JWT token
     """
-    return user_obj.update_user(updated_user=update_data, user_id=current_user['user_id'])
+    return await user_obj.update_user(updated_user=update_data, user_id=current_user['user_id'])
     # if not result.data:
     #     raise HTTPException(status_code=404, detail="User not found")
     
@@ -36,16 +49,23 @@ async def delete_my_account(current_user: Dict = Depends(get_current_user)):
     Delete current user's account
     PROTECTED - requires valid JWT token
     """
-    return user_obj.delete_user(user_id= current_user['user_id'])
+    return await user_obj.delete_user(user_id= current_user['user_id'])
 
 
 @router.put("/profile_image", response_model=Message)
 async def update_profile_image(file: UploadFile = File(...), current_user: Dict = Depends(get_current_user)):
 
-    file_data = await file.read()
+    # Starlette has already spooled the upload, reject oversized files before streaming them to storage
+    if file.size is not None and file.size > settings.max_upload_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
     file_extension = file.filename.split('.')[-1]
     filename = f"profile_picture.{file_extension}"
 
     user_id = current_user['user_id']
 
-    return user_obj.upload_profile_image(Image(image_data=file_data, file_name=filename), user_id)
\ No newline at end of file
+    try:
+        return await user_obj.upload_profile_image(Image(image_file=file.file, file_name=filename), user_id)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -1,5 +1,6 @@
 # app/config.py
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,14 +14,42 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_service_key: str
 
+    ## uploads
+    max_upload_bytes: int = 10 * 1024 * 1024
+    upload_chunk_size: int = 64 * 1024
+
     ## redis
     redis_url: str
+    redis_max_connections: int = 50
+    redis_socket_timeout_seconds: float = 2.0
+    redis_socket_connect_timeout_seconds: float = 2.0
+    redis_health_check_interval_seconds: int = 30
+
+    ## user profile cache
+    user_cache_ttl_seconds: int = 3600
+    user_cache_ttl_jitter_seconds: int = 300
+    user_cache_stale_seconds: int = 300
+    user_cache_negative_ttl_seconds: int = 60
+    user_cache_lock_ms: int = 5000
+    user_cache_lock_wait_ms: int = 2000
+    user_cache_local_max_bytes: int = 32 * 1024 * 1024
+    user_cache_local_ttl_seconds: int = 60
+
+    ## password hashing
+    bcrypt_rounds: int = 12
+    bcrypt_workers: int = 4
+    bcrypt_max_queue: int = 64
 
     ## jwt
-    jwt_secret_key: str
-    jwt_algorithm: str = "HS256"
+    jwt_secret_key: Optional[str] = None # legacy HS256 secret, tokens are now signed with rotating keys
+    jwt_algorithm: str = "ES256" # ES256 or EdDSA, used for newly generated keys
+    jwt_keys_passphrase: Optional[str] = None # encrypts the signing keys held in Redis
+    jwt_key_rotation_days: int = 30
+    jwt_key_check_seconds: int = 3600
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
+    refresh_token_purge_interval_seconds: int = 3600
+    token_cache_max_entries: int = 10000
     
     class Config:
         env_file = ".env"
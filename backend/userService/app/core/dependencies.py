@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import verify_token
+from app.core.token_cache import verified_token_cache
 from typing import Optional, Dict
 
 # This will extract the Bearer token from the Authorization header
@@ -14,15 +15,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """
     token = credentials.credentials
     
-    # Verify the token
-    payload = verify_token(token, token_type="access")
+    # Tokens seen before are served from the verified-token cache until they expire
+    payload = verified_token_cache.get(token)
+    if payload is None:
+        # Verify the token
+        payload = verify_token(token, token_type="access")
     
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        verified_token_cache.put(token, payload)
     
     # Return user info from token
     return {
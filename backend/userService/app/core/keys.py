@@ -0,0 +1,145 @@
+# app/core/keys.py
+from app.config import settings
+from app.db.cache import get_redis
+from app.logger import setup_logger
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import math
+import time
+
+logger = setup_logger(__name__)
+
+## Hash of kid -> PEM private key, shared by every userService replica
+SIGNING_KEYS_KEY = "jwt:signing_keys"
+
+class SigningKeyStore():
+    """
+    Asymmetric JWT signing keys, one per rotation period, kept in Redis under jwt:signing_keys so every
+    replica signs with the same key for a kid. Keys are PEM, encrypted with jwt_keys_passphrase when set.
+
+    The kid is the index of the rotation period. A key is created with HSETNX, so when replicas race
+    for a period exactly one key wins and everyone loads that one. The next period's key is created
+    ahead of time and already published in the JWKS, so verifiers (and the other replicas) have it
+    before the first token signed with it shows up. Retired keys stay published until every token
+    they signed has expired, then they are deleted.
+    """
+    def __init__(self):
+        self._private_keys: Dict[str, Any] = {}
+        self._public_keys: Dict[str, Any] = {}
+        self._jwks: Dict = {"keys": []}
+        self._rotator: Optional[asyncio.Task] = None
+
+    ## Client is created in the app lifespan, so resolve it lazily
+    @property
+    def redis(self):
+        return get_redis()
+
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    @staticmethod
+    def _period(at: float = None) -> int:
+        return int((at or time.time()) // (settings.jwt_key_rotation_days * 86400))
+
+    @staticmethod
+    def algorithm_for(key: Any) -> str:
+        if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            return "EdDSA"
+        return "ES256"
+
+    @staticmethod
+    def _passphrase() -> Optional[bytes]:
+        return settings.jwt_keys_passphrase.encode() if settings.jwt_keys_passphrase else None
+
+    def _generate_pem(self) -> bytes:
+        if settings.jwt_algorithm == "EdDSA":
+            key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            key = ec.generate_private_key(ec.SECP256R1())
+        passphrase = self._passphrase()
+        return key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.BestAvailableEncryption(passphrase) if passphrase else serialization.NoEncryption()
+        )
+
+    async def _ensure_key(self, kid: str) -> None:
+        if await self.redis.hsetnx(SIGNING_KEYS_KEY, kid, self._generate_pem()):
+            logger.info(f"Generated signing key {kid}")
+
+    def _to_jwk(self, kid: str, public_key: Any) -> Dict:
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+        else:
+            jwk = ECAlgorithm.to_jwk(public_key, as_dict=True)
+        jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm_for(public_key)})
+        return jwk
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def rotate(self) -> None:
+        """Make sure the current and next period keys exist, drop expired keys and reload the set"""
+        current = self._period()
+        for period in (current, current + 1):
+            await self._ensure_key(str(period))
+
+        ## A key must outlive the longest token it signed
+        retained_periods = math.ceil(settings.jwt_refresh_token_expire_days / settings.jwt_key_rotation_days)
+        oldest = current - retained_periods
+        private_keys = {}
+        for kid, pem in (await self.redis.hgetall(SIGNING_KEYS_KEY)).items():
+            kid = kid.decode()
+            if not kid.isdigit():
+                continue
+            if int(kid) < oldest:
+                if await self.redis.hdel(SIGNING_KEYS_KEY, kid):
+                    logger.info(f"Retired signing key {kid}")
+                continue
+            private_keys[kid] = serialization.load_pem_private_key(pem, password=self._passphrase())
+
+        self._private_keys = private_keys
+        self._public_keys = {kid: key.public_key() for kid, key in private_keys.items()}
+        self._jwks = {"keys": [self._to_jwk(kid, key) for kid, key in sorted(self._public_keys.items())]}
+
+    def signing_key(self) -> Tuple[str, Any, str]:
+        """(kid, private key, algorithm) for the current rotation period"""
+        kid = str(self._period())
+        key = self._private_keys.get(kid)
+        if key is None:
+            ## The key is loaded a whole period ahead, so this means rotation has been failing that long
+            raise RuntimeError(f"Signing key {kid} is not loaded")
+        return kid, key, self.algorithm_for(key)
+
+    def public_key(self, kid: Optional[str]) -> Optional[Any]:
+        return self._public_keys.get(kid)
+
+    def jwks(self) -> Dict:
+        return self._jwks
+
+    async def _rotate_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.jwt_key_check_seconds)
+            try:
+                await self.rotate()
+            except Exception as e:
+                logger.error(f"Signing key rotation failed: {str(e)}", exc_info=True)
+
+    async def start_rotation(self) -> None:
+        if self._rotator is None:
+            await self.rotate()
+            self._rotator = asyncio.create_task(self._rotate_periodically())
+
+    async def stop_rotation(self) -> None:
+        if self._rotator is not None:
+            self._rotator.cancel()
+            try:
+                await self._rotator
+            except asyncio.CancelledError:
+                pass
+            self._rotator = None
+
+
+key_store = SigningKeyStore()
@@ -1,24 +1,73 @@
 # app/core/security.py
 import bcrypt
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import jwt
 from app.config import settings
+from app.core.keys import key_store
 
 ## Password
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the bcrypt queue is full, the route answers 503 instead of piling up logins"""
+
+## bcrypt spends ~250ms of CPU per call and releases the GIL while it runs, so a small thread pool
+## keeps it off the event loop. The semaphore caps concurrent hashes at the pool size, callers
+## beyond that wait in a bounded queue that is exposed through password_hashing_stats()
+_hash_executor = ThreadPoolExecutor(max_workers=settings.bcrypt_workers, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(settings.bcrypt_workers)
+_hash_stats = {"in_flight": 0, "queued": 0, "completed": 0, "rejected": 0}
+
+def password_hashing_stats() -> Dict[str, int]:
+    return dict(_hash_stats)
+
+async def _run_bcrypt(func: Callable, *args) -> Any:
+    if _hash_stats["queued"] >= settings.bcrypt_max_queue:
+        _hash_stats["rejected"] += 1
+        raise PasswordHashingBusy("Too many concurrent password checks")
+    _hash_stats["queued"] += 1
+    waiting = True
+    try:
+        async with _hash_slots:
+            _hash_stats["queued"] -= 1
+            waiting = False
+            _hash_stats["in_flight"] += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+            finally:
+                _hash_stats["in_flight"] -= 1
+                _hash_stats["completed"] += 1
+    finally:
+        if waiting:
+            _hash_stats["queued"] -= 1
+
+def _hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against hash"""
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
 
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt with the configured work factor"""
+    return await _run_bcrypt(_hash_password, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against hash"""
+    return await _run_bcrypt(_verify_password, plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different work factor than bcrypt_rounds ($2b$<rounds>$...)"""
+    try:
+        return int(hashed_password.split('$')[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
 ## JWT
 def create_access_token(data: Dict[str, Any]) -> str:
     """
@@ -43,11 +92,13 @@ def create_access_token(data: Dict[str, Any]) -> str:
         "type": "access"
     })
     
-    # Create the token
+    # Sign with the current rotation key, the kid tells verifiers which JWKS entry to use
+    kid, signing_key, algorithm = key_store.signing_key()
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
+        signing_key,
+        algorithm=algorithm,
+        headers={"kid": kid}
     )
     
     return encoded_jwt
@@ -75,11 +126,13 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
         "type": "refresh"
     })
     
-    # Create the token
+    # Sign with the current rotation key, the kid tells verifiers which JWKS entry to use
+    kid, signing_key, algorithm = key_store.signing_key()
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
+        signing_key,
+        algorithm=algorithm,
+        headers={"kid": kid}
     )
     
     return encoded_jwt
@@ -95,11 +148,16 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded payload if valid, None if invalid
     """
     try:
+        # Look up the public key named by the kid header
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = key_store.public_key(kid)
+        if public_key is None:
+            return None
         # Decode the token
         payload = jwt.decode(
             token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
+            public_key,
+            algorithms=[key_store.algorithm_for(public_key)]
         )
         return payload
     
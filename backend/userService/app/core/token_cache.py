@@ -0,0 +1,52 @@
+from app.config import settings
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import time
+
+class VerifiedTokenCache():
+    """
+    Bounded LRU of verified access token claims, keyed by a SHA-256 digest of the token so raw
+    tokens are never held. An entry is served until the token's exp, after which it is dropped
+    and the token goes back through full verification (and is rejected as expired).
+    """
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.token_cache_max_entries
+        self._lru: "OrderedDict[bytes, Tuple[Dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        key = self._digest(token)
+        entry = self._lru.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._lru[key]
+            self.misses += 1
+            return None
+        self._lru.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: Dict) -> None:
+        if claims.get("exp") is None:
+            return
+        key = self._digest(token)
+        self._lru[key] = (claims, float(claims["exp"]))
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._lru)}
+
+
+verified_token_cache = VerifiedTokenCache()
@@ -0,0 +1,17 @@
+# app/core/uploads.py
+from app.config import settings
+
+from typing import BinaryIO, Iterator
+
+class UploadTooLarge(ValueError):
+    """An upload grew past max_upload_bytes while it was being streamed"""
+
+def read_chunks(file_obj: BinaryIO, max_bytes: int = None) -> Iterator[bytes]:
+    """Yield the file in upload_chunk_size chunks, failing as soon as more than max_bytes have been read"""
+    max_bytes = max_bytes or settings.max_upload_bytes
+    total = 0
+    while chunk := file_obj.read(settings.upload_chunk_size):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"File exceeds the maximum upload size of {max_bytes} bytes")
+        yield chunk
@@ -1,9 +1,44 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, users
+from contextlib import asynccontextmanager
+from app.api import auth, users, keys
+from app.core.keys import key_store
+from app.db.cache import RedisConnection
+from app.services.profile_cache import profile_cache_obj
+from app.core.security import password_hashing_stats
+from app.core.token_cache import verified_token_cache
+from app.logger import setup_logger
 
-app = FastAPI(title="User Service", version="1.0.0")
+logger = setup_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    logger.info("Application starting...")
+    try:
+        await RedisConnection.initialize()
+        profile_cache_obj.start_invalidation_listener()
+        await key_store.start_rotation()
+        logger.info("All connections initialized")
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}", exc_info=True)
+        raise
+
+    yield
+
+    # Shutdown
+    logger.info("Application shutting down...")
+    try:
+        await profile_cache_obj.stop_invalidation_listener()
+        await key_store.stop_rotation()
+        await RedisConnection.close()
+        logger.info("All connections closed")
+    except Exception as e:
+        logger.error(f"Shutdown error: {str(e)}", exc_info=True)
+
+app = FastAPI(title="User Service", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -17,14 +52,24 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
+app.include_router(keys.router)
 
 @app.get("/")
 def root():
     return {"message": "User Service is running"}
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    """Health check endpoint"""
+    if not await RedisConnection.health_check():
+        return {"status": "unhealthy", "redis": "down"}, 503
+    return {
+        "status": "healthy",
+        "redis": "up",
+        "profile_cache": profile_cache_obj.stats(),
+        "password_hashing": password_hashing_stats(),
+        "token_cache": verified_token_cache.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
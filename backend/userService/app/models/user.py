@@ -1,7 +1,7 @@
 # app/models/user.py
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date
-from typing import Optional
+from typing import Optional, Any, List
 from uuid import UUID
 from .token import Token
 
@@ -29,8 +29,11 @@ class User(BaseModel):
     followers_count: Optional[int] = 0
     following_count: Optional[int] = 0
 
+class UserBatchRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=100)
+
 class Image(BaseModel):
-    image_data: bytes
+    image_file: Any  # file-like object, streamed to storage in chunks
     file_name: str
 
 class Message(BaseModel):
@@ -0,0 +1,29 @@
+from app.services.auth_service import auth_obj
+from app.config import settings
+from app.logger import setup_logger
+
+import asyncio
+
+logger = setup_logger(__name__)
+
+async def main(interval: int) -> None:
+    """Purge expired refresh tokens once, or every interval seconds when interval > 0"""
+    while True:
+        try:
+            await auth_obj.purge_expired_tokens()
+        except Exception as e:
+            logger.error(f"Refresh token purge failed: {str(e)}", exc_info=True)
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Delete expired refresh tokens")
+    parser.add_argument("--interval", type=int, default=settings.refresh_token_purge_interval_seconds,
+                        help="Seconds between purges, 0 to run once")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.interval))
+    except KeyboardInterrupt:
+        logger.info("Refresh token purge stopped")
@@ -1,19 +1,105 @@
 from app.db.database import get_db
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
+from app.db.cache import get_redis
+from app.core.security import hash_password, verify_password, password_needs_rehash, create_access_token, create_refresh_token, verify_token
+from app.config import settings
 from app.models.user import UserRegister, UserLogin, User
 from app.models.token import Token, RefreshToken, LogoutMessage
 from app.logger import setup_logger
 
-from typing import Optional, Dict
+from typing import Optional, Dict, Set
 from datetime import datetime, timedelta, timezone
+import asyncio
+import hashlib
+import hmac
+import secrets
 
 logger = setup_logger(__name__)
 
+## Revoked refresh jtis, bucketed by the day the token expires so each set can expire with its tokens
+REVOKED_REFRESH_PREFIX = "revoked_refresh:"
+
+## Rehashes running after login returned, referenced here so they are not garbage collected mid-run
+_rehash_tasks: Set[asyncio.Task] = set()
+
 class AuthService():
+    """
+    Refresh tokens carry a short random jti. refresh_tokens rows are keyed by jti (unique) and keep
+    only a SHA-256 of the token (token_hash, unique index), never the token itself. Every refresh
+    revokes the presented token and issues a new one, revocations are mirrored into Redis so a
+    revoked token is rejected without touching the table.
+    """
     def __init__(self):
         self.db = get_db()
 
-    def register_user(self, user_data: UserRegister) -> User:
+## HELPER FUNCTIONS-----------------------------------------------------------------
+
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _revoked_key(expires_at: datetime) -> str:
+        return f"{REVOKED_REFRESH_PREFIX}{expires_at.strftime('%Y%m%d')}"
+
+    async def _issue_refresh_token(self, user_id: str, user_name: str, jti: str = None) -> str:
+        jti = jti or secrets.token_urlsafe(12)
+        refresh_token = create_refresh_token({"user_id": user_id, "user_name": user_name, "jti": jti})
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.jwt_refresh_token_expire_days)
+        ## Supabase client is sync, keep the event loop free while it runs
+        await asyncio.to_thread(
+            lambda: self.db.table('refresh_tokens').insert({
+                "jti": jti,
+                "user_id": user_id,
+                "token_hash": self._hash_token(refresh_token),
+                "expires_at": expires_at.isoformat()
+            }).execute()
+        )
+        return refresh_token
+
+    async def _mark_revoked(self, jti: str, expires_at: datetime) -> None:
+        key = self._revoked_key(expires_at)
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.sadd(key, jti)
+        pipe.expireat(key, expires_at.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=2))
+        await pipe.execute()
+
+    async def _is_revoked(self, jti: str, expires_at: datetime) -> bool:
+        return bool(await get_redis().sismember(self._revoked_key(expires_at), jti))
+
+    async def _revoke(self, jti: str, expires_at: datetime) -> Optional[Dict]:
+        """
+        Flip the row to revoked, only if it still is live, and mirror it into Redis.
+        Returns the row, or None when the token was already revoked (or never existed)
+        """
+        result = await asyncio.to_thread(
+            lambda: self.db.table('refresh_tokens').update({"revoked": True})
+                .eq('jti', jti).eq('revoked', False).execute()
+        )
+        if not result.data:
+            return None
+        await self._mark_revoked(jti, expires_at)
+        return result.data[0]
+
+    async def _withdraw(self, jti: str) -> None:
+        """Delete a just-issued refresh token row that was never handed out"""
+        try:
+            await asyncio.to_thread(
+                lambda: self.db.table('refresh_tokens').delete().eq('jti', jti).execute()
+            )
+        except Exception as e:
+            ## Unreachable token, it is purged once expired
+            logger.warning(f"Failed to withdraw refresh token {jti}: {str(e)}")
+
+    def _decode_refresh_token(self, refresh_token: str) -> Dict:
+        payload = verify_token(refresh_token, token_type="refresh")
+        if not payload or not payload.get("jti"):
+            raise ValueError("Invalid refresh token")
+        payload["expires_at"] = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        return payload
+
+## MAIN FUNCTIONS-------------------------------------------------------------------
+
+    async def register_user(self, user_data: UserRegister) -> User:
         """Register a new user"""
         logger.info(f"Creating a new user for: {user_data.full_name}")
         # Check if email already exists
@@ -23,7 +109,7 @@ class AuthService():
             raise ValueError("Email already registered")
         # Prepare user data with hashed password
         user_dict = user_data.model_dump()
-        user_dict['password_hash'] = hash_password(user_dict.pop('password'))
+        user_dict['password_hash'] = await hash_password(user_dict.pop('password'))
         user_dict['date_of_birth'] = str(user_dict['date_of_birth'])
         # Insert into database
         result = self.db.table('users').insert(user_dict).execute()
@@ -38,7 +124,24 @@ class AuthService():
             )
         raise Exception("Failed to create user")
 
-    def login_user(self, login_data: UserLogin) -> User:
+    async def _rehash_password(self, user_id: str, password: str, old_hash: str) -> None:
+        """Upgrade a hash made with an old work factor, only possible while we hold the plain password"""
+        try:
+            password_hash = await hash_password(password)
+            ## Only replace the hash that was verified, a password changed meanwhile is kept
+            await asyncio.to_thread(
+                lambda: self.db.table('users')
+                    .update({"password_hash": password_hash})
+                    .eq('id', user_id)
+                    .eq('password_hash', old_hash)
+                    .execute()
+            )
+            logger.info(f"Rehashed password for user id: {user_id}")
+        except Exception as e:
+            ## The old hash still verifies, try again on the next login
+            logger.warning(f"Failed to rehash password for user id: {user_id}: {str(e)}")
+
+    async def login_user(self, login_data: UserLogin) -> User:
         """Authenticate user and return user data if successful"""
         logger.info(f"Trying to login user: {login_data.email}")
         result = self.db.table('users').select("*").eq('email', login_data.email).execute()
@@ -46,21 +149,20 @@ class AuthService():
             logger.error(f"User does not exist for {login_data.email}")
             return None 
         user = result.data[0]
-        if not verify_password(login_data.password, user['password_hash']):
+        if not await verify_password(login_data.password, user['password_hash']):
             logger.error(f"Wrong password for {login_data.email}")
             return None
+        if password_needs_rehash(user['password_hash']):
+            ## A second bcrypt round at the new cost would double login latency, run it after returning
+            task = asyncio.create_task(self._rehash_password(user['id'], login_data.password, user['password_hash']))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
         token_data = {
                 "user_id": user['id'],
                 "user_name": user['user_name']
             }
         access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token(token_data)
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-        self.db.table('refresh_tokens').insert({
-            "user_id": user['id'],
-            "token": refresh_token,
-            "expires_at": expires_at.isoformat()
-        }).execute()
+        refresh_token = await self._issue_refresh_token(user['id'], user['user_name'])
         logger.info(f"Generated access token and stored refresh tokens for user id: {user['id']} and email: {login_data.email} and login successful")
         return User(
             token=Token(
@@ -74,52 +176,79 @@ class AuthService():
             image_url=user['profile_image_url']
         )
 
-    def logout_user(self, request: RefreshToken) -> LogoutMessage:
+    async def logout_user(self, request: RefreshToken) -> LogoutMessage:
         """Logout user by revoking refresh token"""
-        result = self.db.table('refresh_tokens').update({
-            "revoked": True
-        }).eq('token', request.refresh_token).execute()
-
-        user = self.db.table('refresh_tokens').select("user_id").eq('token', request.refresh_token).execute()
-        user = user.data[0]
+        payload = self._decode_refresh_token(request.refresh_token)
+        row = await self._revoke(payload['jti'], payload['expires_at'])
 
-        if not result.data:
+        if not row:
             raise ValueError("User already logged out")
         
         return LogoutMessage(
-            message=f"User {user['user_id']} logged out successfully"
+            message=f"User {row['user_id']} logged out successfully"
         )
 
-    def refresh_token(self, request: RefreshToken) -> Token:
-        """Get new access token using stored refresh token"""
-        result = self.db.table('refresh_tokens').select("*").eq('token', request.refresh_token).eq('revoked', False).execute()
+    async def refresh_token(self, request: RefreshToken) -> Token:
+        """
+        Rotate a refresh token: the presented token is revoked and a new access and refresh token
+        are issued. Signature and expiry are checked locally, revocation in Redis, then one lookup by jti
+        """
+        payload = self._decode_refresh_token(request.refresh_token)
+        jti = payload['jti']
 
-        if not result.data:
+        if await self._is_revoked(jti, payload['expires_at']):
+            logger.error(f"Revoked refresh token presented for user id: {payload.get('user_id')}")
             raise ValueError("Invalid refresh token")
-        
-        token_data = result.data[0]
 
-        expires_at = datetime.fromisoformat(token_data['expires_at'].replace('Z', '+00:00'))
-        if expires_at < datetime.now(timezone.utc):
-            raise ValueError("Refresh token expired")
-        
-        user_result = self.db.table('users').select("id, user_name").eq('id', token_data['user_id']).execute()
-        if not user_result.data:
-            raise ValueError("User not found")
-        
-        user = user_result.data[0]
+        result = await asyncio.to_thread(
+            lambda: self.db.table('refresh_tokens').select("user_id, token_hash").eq('jti', jti).execute()
+        )
+        if not result.data or not hmac.compare_digest(result.data[0]['token_hash'], self._hash_token(request.refresh_token)):
+            raise ValueError("Invalid refresh token")
+        user_id = result.data[0]['user_id']
+
+        ## Re-read the user so a renamed user's new tokens carry the current user_name
+        user = await asyncio.to_thread(
+            lambda: self.db.table('users').select("user_name").eq('id', user_id).execute()
+        )
+        if not user.data:
+            raise ValueError("Invalid refresh token")
+        user_name = user.data[0]['user_name']
 
-        new_token_data = {
-            "user_id": user['id'],
-            "user_name": user['user_name'] 
-        }
+        ## Issue the new token before revoking the old one, a failed insert then leaves the user signed in
+        new_jti = secrets.token_urlsafe(12)
+        new_refresh_token = await self._issue_refresh_token(user_id, user_name, jti=new_jti)
 
-        new_access_token = create_access_token(new_token_data)
+        ## Conditional update, if two requests race with the same token only one of them rotates it.
+        ## The loser (or a failed revoke) withdraws the token it just issued
+        try:
+            row = await self._revoke(jti, payload['expires_at'])
+        except Exception:
+            await self._withdraw(new_jti)
+            raise
+        if not row:
+            await self._withdraw(new_jti)
+            raise ValueError("Invalid refresh token")
+
+        new_access_token = create_access_token({
+            "user_id": user_id,
+            "user_name": user_name
+        })
 
         return Token(
             access_token=new_access_token,
-            refresh_token=request.refresh_token,
+            refresh_token=new_refresh_token,
             token_type="bearer"
         )
 
+    async def purge_expired_tokens(self) -> int:
+        """Delete refresh token rows past their expiry, returns how many were removed"""
+        now = datetime.now(timezone.utc).isoformat()
+        result = await asyncio.to_thread(
+            lambda: self.db.table('refresh_tokens').delete().lt('expires_at', now).execute()
+        )
+        purged = len(result.data or [])
+        logger.info(f"Purged {purged} expired refresh tokens")
+        return purged
+
 auth_obj = AuthService()
\ No newline at end of file
@@ -0,0 +1,264 @@
+from app.db.cache import get_redis
+from app.config import settings
+from app.logger import setup_logger
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import random
+import sys
+import time
+
+logger = setup_logger(__name__)
+
+Loader = Callable[[List[str]], Awaitable[Dict[str, Dict]]]
+
+USER_KEY_PREFIX = "user:"
+USER_INVALIDATION_CHANNEL = "users:invalidate"
+INVALIDATION_RETRY_MAX_SECONDS = 30
+
+class ProfileCache():
+    """
+    Two-tier cache for user profiles: a byte-bounded in-process LRU in front of user:{id} Redis hashes.
+    Writers call invalidate(), which drops the Redis hash and publishes the id on users:invalidate
+    so every worker evicts its local copy.
+
+    Every entry carries a logical expiry (_expires_at) that is shorter than its Redis TTL. Past the
+    logical expiry one caller takes a per-key lock and rebuilds the entry while everyone else keeps
+    getting the stale copy. A cold key is rebuilt by the lock holder only, other callers wait for it.
+    Ids that do not exist are cached as short-lived negative entries.
+    """
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes or settings.user_cache_local_max_bytes
+        self._lru: "OrderedDict[str, Tuple[Optional[Dict[str, str]], float, int]]" = OrderedDict()
+        self._lru_bytes = 0
+        self._subscriber: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    ## Client is created in the app lifespan, so resolve it lazily
+    @property
+    def redis(self):
+        return get_redis()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"{USER_KEY_PREFIX}{user_id}"
+
+    ## LRU ------------------------------------------------------------------------------
+
+    @staticmethod
+    def _sizeof(user_id: str, value: Optional[Dict[str, str]]) -> int:
+        size = sys.getsizeof(user_id)
+        if value:
+            size += sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+        return size
+
+    def _lru_get(self, user_id: str, now: float):
+        """Returns (found, value), value is None for a cached unknown id"""
+        entry = self._lru.get(user_id)
+        if entry is None or entry[1] <= now:
+            self.misses += 1
+            return False, None
+        self._lru.move_to_end(user_id)
+        self.hits += 1
+        return True, entry[0]
+
+    def _lru_put(self, user_id: str, value: Optional[Dict[str, str]], expires_at: float) -> None:
+        ## Local copies live at most user_cache_local_ttl_seconds, in case an invalidation is missed
+        expires_at = min(expires_at, time.time() + settings.user_cache_local_ttl_seconds)
+        size = self._sizeof(user_id, value)
+        self.evict(user_id)
+        self._lru[user_id] = (value, expires_at, size)
+        self._lru_bytes += size
+        while self._lru_bytes > self.max_bytes and self._lru:
+            _, (_, _, evicted) = self._lru.popitem(last=False)
+            self._lru_bytes -= evicted
+
+    def evict(self, user_id: str) -> None:
+        old = self._lru.pop(user_id, None)
+        if old is not None:
+            self._lru_bytes -= old[2]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._lru),
+            "bytes": self._lru_bytes
+        }
+
+    ## Redis ----------------------------------------------------------------------------
+
+    async def _read(self, user_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hgetall(self._key(user_id))
+        entries = {}
+        for user_id, cached in zip(user_ids, await pipe.execute()):
+            if cached:
+                entries[user_id] = {k.decode(): v.decode() for k, v in cached.items()} # Decode from bytes -> string
+        return entries
+
+    async def _store(self, user_ids: List[str], loaded: Dict[str, Dict]) -> Dict[str, float]:
+        """Write rebuilt entries to Redis, returns the logical expiry of each"""
+        now = time.time()
+        expiries = {}
+        pipe = self.redis.pipeline(transaction=True)
+        for user_id in user_ids:
+            key = self._key(user_id)
+            pipe.delete(key)
+            if user_id in loaded:
+                ttl = settings.user_cache_ttl_seconds + random.randint(0, settings.user_cache_ttl_jitter_seconds)
+                mapping = {k: "" if v is None else v for k, v in loaded[user_id].items()} # Redis cannot store None
+                mapping['_expires_at'] = expiries[user_id] = now + ttl
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ttl + settings.user_cache_stale_seconds)
+            else:
+                expiries[user_id] = now + settings.user_cache_negative_ttl_seconds
+                pipe.hset(key, mapping={"_missing": 1, "_expires_at": expiries[user_id]})
+                pipe.expire(key, settings.user_cache_negative_ttl_seconds)
+        await pipe.execute()
+        return expiries
+
+    @staticmethod
+    def _value(entry: Dict[str, str]) -> Optional[Dict[str, str]]:
+        if '_missing' in entry:
+            return None
+        return {k: v for k, v in entry.items() if not k.startswith('_')}
+
+    async def _wait_for(self, user_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """Poll for entries being rebuilt by another caller, up to user_cache_lock_wait_ms"""
+        deadline = time.monotonic() + settings.user_cache_lock_wait_ms / 1000
+        found = {}
+        pending = list(user_ids)
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            found.update(await self._read(pending))
+            pending = [user_id for user_id in pending if user_id not in found]
+        return found
+
+    ## MAIN FUNCTIONS -------------------------------------------------------------------
+
+    async def get_many(self, user_ids: List[str], loader: Loader) -> Dict[str, Optional[Dict[str, str]]]:
+        """
+        Resolve profiles for user_ids, awaiting loader(ids) for the ids this caller has to rebuild.
+        Maps each id to its profile fields, or None when the user does not exist.
+        """
+        now = time.time()
+        result = {}
+        remote = []
+        for user_id in user_ids:
+            found, value = self._lru_get(user_id, now)
+            if found:
+                result[user_id] = value
+            else:
+                remote.append(user_id)
+        if not remote:
+            return result
+
+        entries = await self._read(remote)
+        rebuild, locks, waiting = [], {}, []
+        for user_id in remote:
+            entry = entries.get(user_id)
+            if entry is not None and float(entry['_expires_at']) > now:
+                result[user_id] = self._value(entry)
+                self._lru_put(user_id, result[user_id], float(entry['_expires_at']))
+                continue
+            ## Missing or logically expired: only the lock holder goes to the database
+            lock = self.redis.lock(f"lock:{self._key(user_id)}", timeout=settings.user_cache_lock_ms / 1000)
+            if await lock.acquire(blocking=False):
+                locks[user_id] = lock
+                rebuild.append(user_id)
+            elif entry is not None:
+                result[user_id] = self._value(entry) # serve stale while another caller rebuilds
+            else:
+                waiting.append(user_id)
+
+        try:
+            if rebuild:
+                loaded = await loader(rebuild)
+                expiries = await self._store(rebuild, loaded)
+                for user_id in rebuild:
+                    result[user_id] = loaded.get(user_id)
+                    self._lru_put(user_id, result[user_id], expiries[user_id])
+        finally:
+            for lock in locks.values():
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Failed to release cache lock: {str(e)}")
+
+        if waiting:
+            found = await self._wait_for(waiting)
+            for user_id, entry in found.items():
+                result[user_id] = self._value(entry)
+            leftovers = [user_id for user_id in waiting if user_id not in found]
+            if leftovers:
+                logger.warning(f"Gave up waiting for cache rebuild of {len(leftovers)} users")
+                loaded = await loader(leftovers)
+                for user_id in leftovers:
+                    result[user_id] = loaded.get(user_id)
+        return result
+
+    async def invalidate(self, user_id: str) -> bool:
+        """Drop a profile from Redis and from the local tier of every worker"""
+        self.evict(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(self._key(user_id))
+        pipe.publish(USER_INVALIDATION_CHANNEL, user_id)
+        deleted, _ = await pipe.execute()
+        return bool(deleted)
+
+    ## Pub/Sub --------------------------------------------------------------------------
+
+    async def _listen_for_invalidations(self) -> None:
+        """
+        Subscribe and evict until cancelled. A dropped connection is retried with backoff, and since
+        messages published while disconnected are lost, the local LRU is cleared on every resubscribe
+        """
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+                if reconnecting:
+                    self._lru.clear()
+                    self._lru_bytes = 0
+                    logger.info("Resubscribed to invalidations, cleared local cache")
+                backoff = 1.0
+                while True:
+                    ## Poll with a timeout, a blocking listen() would trip the pool's socket_timeout when idle
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self.evict(message['data'].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation listener lost its connection, retrying in {backoff:.0f}s: {str(e)}")
+                reconnecting = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, INVALIDATION_RETRY_MAX_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start_invalidation_listener(self) -> None:
+        """Evict profiles from this worker's LRU when any service publishes a change"""
+        if self._subscriber is None:
+            self._subscriber = asyncio.create_task(self._listen_for_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+
+
+profile_cache_obj = ProfileCache()
@@ -0,0 +1,32 @@
+from app.db.database import get_db
+from app.config import settings
+from app.core.uploads import read_chunks
+
+from typing import BinaryIO
+import httpx
+
+class StorageService():
+    def __init__(self):
+        self.db = get_db()
+        self.bucket_name = "user_images"
+        # Raw HTTP client against the storage API, used for streaming uploads
+        self.http = httpx.Client(
+            base_url=f"{settings.supabase_url}/storage/v1",
+            headers={
+                "Authorization": f"Bearer {settings.supabase_service_key}",
+                "apikey": settings.supabase_service_key,
+            },
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+
+    def upload_stream(self, file_obj: BinaryIO, file_path: str, content_type: str, upsert: bool = False) -> str:
+        """Stream a file-like object to storage chunk by chunk and return its public URL"""
+        response = self.http.post(
+            f"/object/{self.bucket_name}/{file_path}",
+            content=read_chunks(file_obj),
+            headers={"content-type": content_type, "x-upsert": "true" if upsert else "false"}
+        )
+        response.raise_for_status()
+        return self.db.storage.from_(self.bucket_name).get_public_url(file_path)
+
+storage_obj = StorageService()
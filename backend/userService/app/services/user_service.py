@@ -1,58 +1,69 @@
 from app.db.database import get_db
-from app.db.cache import get_redis
+from app.services.profile_cache import profile_cache_obj
+from app.services.storage_service import storage_obj
 from app.models.user import User, UserUpdate, Image, Message
+from app.logger import setup_logger
+from typing import Dict, List
+import asyncio
+
+logger = setup_logger(__name__)
+
+USER_PROFILE_FIELDS = 'id, full_name, user_name, followers_count, following_count, profile_image_url'
 
 class UserService():
     def __init__(self):
         self.db = get_db()
-        self.redis = get_redis()
         self.bucket_name = "user_images"
     
-    def get_user(self, user_id: str) -> User:
-        try:
-            ## Try to get from cache first
-            if self.redis.exists(f"user:{user_id}"):
-                print("Fetching from cache")
-                user = self.redis.hgetall(f"user:{user_id}")
-                user = {k.decode(): v.decode() for k, v in user.items()} # Decode from bytes -> string
-                return User(
-                    user_id=user_id,
-                    full_name=user['full_name'],
-                    user_name=user['user_name'],
-                    image_url=user['profile_image_url'],
-                    followers_count=int(user.get('followers_count', 0)),
-                    following_count=int(user.get('following_count', 0))
-                )
+    @staticmethod
+    def _to_user(user_id: str, user: Dict) -> User:
+        return User(
+            user_id=user_id,
+            full_name=user['full_name'],
+            user_name=user['user_name'],
+            image_url=user['profile_image_url'] or None,
+            followers_count=int(user.get('followers_count') or 0),
+            following_count=int(user.get('following_count') or 0)
+        )
 
-            ## If not in cache, get from DB
-            print("Fetching from DB")
-            result = self.db.table('users').select('full_name, user_name, followers_count, following_count, profile_image_url').eq('id', user_id).execute()
-            if result.data:
-                user = result.data[0]
-                # Store in cache for future requests
-                print("Storing in cache")
-                self.redis.hset(f"user:{user_id}", mapping=user)
-                return  User(
-                    user_id=user_id,
-                    full_name=user['full_name'],
-                    user_name=user['user_name'],
-                    image_url=user['profile_image_url'],
-                    followers_count=int(user.get('followers_count', 0)),
-                    following_count=int(user.get('following_count', 0))
-                )
+    async def _load_users(self, user_ids: List[str]) -> Dict[str, Dict]:
+        ## Supabase client is sync, keep the event loop free while it runs
+        result = await asyncio.to_thread(
+            lambda: self.db.table('users').select(USER_PROFILE_FIELDS).in_('id', user_ids).execute()
+        )
+        return {user.pop('id'): user for user in (result.data or [])}
 
+    async def get_users(self, user_ids: List[str]) -> List[User]:
+        """
+        Batch profile lookup through the profile cache: one pipelined Redis round trip for all
+        hashes and one Supabase query for the misses this request rebuilds. Unknown ids are skipped.
+        """
+        try:
+            user_ids = list(dict.fromkeys(user_ids))
+            if not user_ids:
+                return []
+            users = await profile_cache_obj.get_many(user_ids, loader=self._load_users)
+            return [self._to_user(user_id, users[user_id]) for user_id in user_ids if users.get(user_id)]
         except Exception as e:
-            raise Exception(f"Failed to fetch user: {str(e)}")
+            raise Exception(f"Failed to fetch users: {str(e)}")
 
+    async def get_user(self, user_id: str) -> User:
+        users = await self.get_users([user_id])
+        if users:
+            return users[0]
 
-    def update_user(self, updated_user: UserUpdate, user_id: str) -> User:
+
+    async def update_user(self, updated_user: UserUpdate, user_id: str) -> User:
         try:
             updated_user = {k: v for k, v in updated_user.items() if v is not None}
-            result = self.db.table('users').update(updated_user).eq('id', user_id).execute()
+            result = await asyncio.to_thread(
+                lambda: self.db.table('users').update(updated_user).eq('id', user_id).execute()
+            )
             if result:
                 user = result.data[0]
                 ## Invalidate the cache
-                print("Deleted from cache") if self.redis.delete(f"user:{user_id}") else None
+                if await profile_cache_obj.invalidate(user_id):
+                    logger.info(f"Evicted cached profile {user_id}")
                 return User(
                     user_id=user['id'],
                     full_name=user['full_name'],
@@ -65,18 +76,28 @@ class UserService():
             raise Exception(f"Failed to update user: {user_id} due to {str(e)}")
     
         
-    def delete_user(self, user_id: str) -> Message:
+    async def delete_user(self, user_id: str) -> Message:
         try:
-            result = self.db.table('users').delete().eq('id', user_id).execute()
+            result = await asyncio.to_thread(
+                lambda: self.db.table('users').delete().eq('id', user_id).execute()
+            )
             if bool(result):
                 # Invalidate the cache
-                print("Deleted from cache") if self.redis.delete(f"user:{user_id}") else None
+                if await profile_cache_obj.invalidate(user_id):
+                    logger.info(f"Evicted cached profile {user_id}")
                 return Message(message=f"User: {user_id} deleted successfully")
         except Exception as e:
             raise Exception(f"Failed to delete user: {user_id} due to {str(e)}")
     
 
-    def upload_profile_image(self, image: Image, user_id: str) -> Message:
+    async def upload_profile_image(self, image: Image, user_id: str) -> Message:
+        ## Storage and Supabase clients are sync, stream the spooled file from a worker thread
+        message = await asyncio.to_thread(self._upload_profile_image, image, user_id)
+        if message:
+            await profile_cache_obj.invalidate(user_id)
+        return message
+
+    def _upload_profile_image(self, image: Image, user_id: str) -> Message:
         try:
             # Check if profile picture exists, if yes then delete older
             image_url = self.db.table("users").select("profile_image_url").eq("id", user_id).execute()
@@ -85,22 +106,22 @@ class UserService():
             # Create unique file path
             file_path = f"{user_id}/{image.file_name}"
             
-            # Upload to storage
-            result = self.db.storage.from_(self.bucket_name).upload(
-                path=file_path,
-                file=image.image_data,
-                file_options={"content-type": "image/jpeg"}
+            # Stream to storage and get public URL
+            public_url = storage_obj.upload_stream(
+                file_obj=image.image_file,
+                file_path=file_path,
+                content_type="image/jpeg"
             )
             
-            if result:
-                # Get public URL
-                public_url = self.db.storage.from_(self.bucket_name).get_public_url(file_path)
+            if public_url:
                 upload_to_db = self.db.table("users").update({
                     "profile_image_url": public_url
                 }).eq("id", user_id).execute()
                 if bool(upload_to_db):
                     return Message(message="Image uploaded successfully")
                 
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to upload image: {str(e)}")
 
@@ -0,0 +1,67 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import time
+from app.services.profile_cache import ProfileCache
+
+PROFILE = {"full_name": "Test User", "user_name": "test_user", "followers_count": "3", "following_count": "4"}
+
+def _entry_size(user_id: str, value) -> int:
+    return ProfileCache._sizeof(user_id, value)
+
+@pytest.fixture
+def cache():
+    ## Room for exactly three profiles of this shape
+    return ProfileCache(max_bytes=3 * _entry_size("user-0", PROFILE))
+
+def test_put_then_get(cache):
+    now = time.time()
+    cache._lru_put("user-0", PROFILE, now + 60)
+    assert cache._lru_get("user-0", now) == (True, PROFILE)
+    assert cache.stats()["hits"] == 1
+
+def test_negative_entry_is_a_hit_with_no_value(cache):
+    now = time.time()
+    cache._lru_put("missing", None, now + 60)
+    assert cache._lru_get("missing", now) == (True, None)
+
+def test_expired_entry_is_a_miss(cache):
+    now = time.time()
+    cache._lru_put("user-0", PROFILE, now + 60)
+    assert cache._lru_get("user-0", now + 3600) == (False, None)
+    assert cache.stats()["misses"] == 1
+
+def test_bytes_stay_within_budget_and_oldest_is_evicted(cache):
+    now = time.time()
+    for i in range(3):
+        cache._lru_put(f"user-{i}", PROFILE, now + 60)
+    cache._lru_get("user-0", now) # user-1 is now the least recently used
+    cache._lru_put("user-3", PROFILE, now + 60)
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache._lru_get("user-1", now) == (False, None)
+    assert cache._lru_get("user-0", now)[0]
+    assert cache._lru_get("user-3", now)[0]
+
+def test_replacing_an_entry_does_not_double_count(cache):
+    now = time.time()
+    cache._lru_put("user-0", PROFILE, now + 60)
+    cache._lru_put("user-0", PROFILE, now + 60)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == _entry_size("user-0", PROFILE)
+
+def test_evict_releases_bytes(cache):
+    now = time.time()
+    cache._lru_put("user-0", PROFILE, now + 60)
+    cache.evict("user-0")
+    cache.evict("never-cached")
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+def test_entry_larger_than_budget_is_not_kept():
+    cache = ProfileCache(max_bytes=1)
+    cache._lru_put("user-0", PROFILE, time.time() + 60)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
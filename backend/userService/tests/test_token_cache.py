@@ -0,0 +1,44 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import time
+from app.core.token_cache import VerifiedTokenCache
+
+@pytest.fixture
+def cache():
+    return VerifiedTokenCache(max_entries=3)
+
+def test_cached_claims_are_returned_until_exp(cache):
+    claims = {"user_id": "u1", "exp": time.time() + 60}
+    cache.put("token-1", claims)
+    assert cache.get("token-1") == claims
+    assert cache.stats()["hits"] == 1
+
+def test_expired_entry_is_dropped(cache):
+    cache.put("token-1", {"user_id": "u1", "exp": time.time() - 1})
+    assert cache.get("token-1") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 1
+
+def test_claims_without_exp_are_not_cached(cache):
+    cache.put("token-1", {"user_id": "u1"})
+    assert cache.get("token-1") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted(cache):
+    exp = time.time() + 60
+    for i in range(3):
+        cache.put(f"token-{i}", {"user_id": f"u{i}", "exp": exp})
+    cache.get("token-0") # token-1 is now the least recently used
+    cache.put("token-3", {"user_id": "u3", "exp": exp})
+    assert cache.get("token-1") is None
+    assert cache.get("token-0") is not None
+    assert cache.get("token-3") is not None
+    assert cache.stats()["entries"] == 3
+
+def test_raw_tokens_are_not_held(cache):
+    cache.put("secret-token", {"user_id": "u1", "exp": time.time() + 60})
+    assert all(isinstance(key, bytes) and b"secret-token" not in key for key in cache._lru)